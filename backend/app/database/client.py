@@ -1,5 +1,8 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from config import Settings
+import logging
+
+logger = logging.getLogger(__name__)
 
 class Database:
     client: AsyncIOMotorClient = None
@@ -20,12 +23,12 @@ async def connect_to_mongo():
     )
     try:
         await db.client.admin.command('ping')
-        print("Successfully connected to MongoDB!")
+        logger.info("Successfully connected to MongoDB")
     except Exception as e:
-        print(f"MongoDB connection error: {e}")
+        logger.error("MongoDB connection error: %s", e)
         raise
 
 async def close_mongo_connection():
     if db.client:
         db.client.close()
-        print("MongoDB connection closed")   
\ No newline at end of file
+        logger.info("MongoDB connection closed")   
\ No newline at end of file
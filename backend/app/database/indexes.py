@@ -0,0 +1,69 @@
+# app/database/indexes.py
+import logging
+import time
+from typing import Dict, List, Optional, Type
+
+from beanie import Document
+
+logger = logging.getLogger(__name__)
+
+class IndexBuilder:
+    """Creates each model's declared ``Settings.indexes`` after startup.
+
+    Used with ``init_beanie(skip_indexes=True)`` so boot does not wait on
+    index builds. Every index is created on its own, so one that fails
+    (e.g. duplicates violating a new unique index) is logged and reported
+    while the rest of its collection's indexes are still built. Existing
+    identical indexes are a no-op. ``build`` may be called more than once,
+    e.g. to build a few indexes before serving and the rest afterwards.
+    """
+
+    def __init__(self):
+        self.state = "pending"
+        # collection -> index name -> "pending", "building", "built" or "failed"
+        self.indexes: Dict[str, Dict[str, str]] = {}
+        # "collection.index" -> error
+        self.failed: Dict[str, str] = {}
+        self.duration: Optional[float] = None
+
+    async def build(self, models: List[Type[Document]]):
+        self.state = "running"
+        started = time.monotonic()
+        pending = []
+        for model in models:
+            collection = model.get_motor_collection()
+            statuses = self.indexes.setdefault(collection.name, {})
+            for field in model.get_settings().indexes:
+                statuses[field.index.document["name"]] = "pending"
+                pending.append((collection, field.index))
+        for collection, index in pending:
+            name = index.document["name"]
+            self.indexes[collection.name][name] = "building"
+            try:
+                await collection.create_indexes([index])
+                self.indexes[collection.name][name] = "built"
+            except Exception as e:
+                self.indexes[collection.name][name] = "failed"
+                self.failed[f"{collection.name}.{name}"] = str(e)
+                logger.error("Index build failed for %s.%s: %s", collection.name, name, e)
+        self.duration = (self.duration or 0) + time.monotonic() - started
+        self.state = "failed" if self.failed else "done"
+        logger.info("Index builds %s in %.1fs", self.state, self.duration)
+
+    def is_built(self, model: Type[Document]) -> bool:
+        """Whether every index declared on ``model`` has been built"""
+        statuses = self.indexes.get(model.get_motor_collection().name, {})
+        return all(
+            statuses.get(field.index.document["name"]) == "built"
+            for field in model.get_settings().indexes
+        )
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "indexes": self.indexes,
+            "failed": self.failed,
+            "duration_s": round(self.duration, 3) if self.duration is not None else None
+        }
+
+index_builder = IndexBuilder()
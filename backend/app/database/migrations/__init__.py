@@ -0,0 +1,13 @@
+from .runner import Migration, MigrationRunner, Throttle
+from .m0001_shelf_membership import ShelfMembershipMigration
+from .m0002_default_shelves import DefaultShelfMigration
+from .m0003_catalog_details import CatalogDetailsMigration
+from .m0004_query_log_hits import QueryLogHitsMigration
+
+# Every migration, applied in name order
+MIGRATIONS = [
+    ShelfMembershipMigration(),
+    DefaultShelfMigration(),
+    CatalogDetailsMigration(),
+    QueryLogHitsMigration(),
+]
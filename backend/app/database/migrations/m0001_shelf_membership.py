@@ -0,0 +1,49 @@
+# app/database/migrations/m0001_shelf_membership.py
+import logging
+from typing import Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from app.database.migrations.runner import Migration
+
+logger = logging.getLogger(__name__)
+
+LEGACY_ITEMS_INDEX = "user_id_1_media_type_1_items_1"
+
+class ShelfMembershipMigration(Migration):
+    """Drop the legacy embedded ``shelves.items`` arrays.
+
+    ``shelf_items`` has always been what shelf listings read, so it is the
+    source of truth and nothing is copied from the arrays. Ids found only
+    in an array are items that were removed: the old remove_from_shelf
+    deleted the user's shelf items for a media id but pulled it from just
+    one shelf's array. They are counted in the log, not restored.
+    """
+    name = "0001_shelf_membership"
+    collection = "shelves"
+    filter = {"items": {"$exists": True}}
+    projection = {"user_id": 1, "items": 1}
+
+    async def plan(self, database: AsyncIOMotorDatabase, batch: List[dict]) -> Dict[str, list]:
+        shelf_ids = [str(shelf["_id"]) for shelf in batch]
+        existing = {
+            (item["shelf_id"], item["media_id"])
+            async for item in database["shelf_items"].find(
+                {"user_id": {"$in": list({shelf["user_id"] for shelf in batch})}, "shelf_id": {"$in": shelf_ids}},
+                {"shelf_id": 1, "media_id": 1}
+            )
+        }
+        stale = sum(
+            (str(shelf["_id"]), media_id) not in existing
+            for shelf in batch
+            for media_id in set(shelf.get("items") or [])
+        )
+        if stale:
+            logger.info("Dropping %d array-only (removed) item ids from %d shelves", stale, len(batch))
+        return {"shelves": [UpdateOne({"_id": shelf["_id"]}, {"$unset": {"items": ""}}) for shelf in batch]}
+
+    async def finalize(self, database: AsyncIOMotorDatabase):
+        # Nothing queries the arrays any more
+        if LEGACY_ITEMS_INDEX in await database["shelves"].index_information():
+            await database["shelves"].drop_index(LEGACY_ITEMS_INDEX)
@@ -0,0 +1,87 @@
+# app/database/migrations/m0002_default_shelves.py
+from datetime import datetime
+from typing import Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteOne, UpdateOne
+
+from app.database.migrations.runner import Migration
+from app.database.schemas.shelf import MediaType, ShelfStatus
+from app.services.shelf_service import ShelfService
+
+class DefaultShelfMigration(Migration):
+    """Merge duplicate default shelves so each status has one document.
+
+    Shelves created before the unique ``(user_id, media_type, status)``
+    default-shelf index can repeat a status, sometimes under a differently
+    cased name ("Did not Finish" and "Did Not Finish"), and the index build
+    fails until they are merged. The oldest shelf per status is kept under
+    its ``DEFAULT_SHELVES`` name; items on the others move to it (dropping
+    any it already has) and the others are deleted. Items are moved before
+    shelves are deleted, so a replayed batch only finishes the job.
+
+    Runs after 0001_shelf_membership, which drops the legacy ``items``
+    arrays, so membership is all in ``shelf_items``. The app builds indexes at startup, so restart it once
+    this has run if the default-shelf index was reported as failed.
+    """
+    name = "0002_default_shelves"
+    collection = "shelves"
+    filter = {"shelf_type": "default"}
+    projection = {"user_id": 1, "media_type": 1, "status": 1, "name": 1}
+
+    async def plan(self, database: AsyncIOMotorDatabase, batch: List[dict]) -> Dict[str, list]:
+        # The stream is in _id order, so a status's oldest shelf is in this
+        # batch or an earlier one; look across all of them to find it
+        keepers = {}
+        async for shelf in database["shelves"].find(
+            {
+                **self.filter,
+                "user_id": {"$in": list({shelf["user_id"] for shelf in batch})},
+                "media_type": {"$in": list({shelf["media_type"] for shelf in batch})}
+            },
+            {"user_id": 1, "media_type": 1, "status": 1},
+            sort=[("_id", 1)]
+        ):
+            keepers.setdefault((shelf["user_id"], shelf["media_type"], shelf["status"]), shelf["_id"])
+
+        duplicates = {}
+        shelf_writes = []
+        for shelf in batch:
+            keeper = keepers[(shelf["user_id"], shelf["media_type"], shelf["status"])]
+            if keeper != shelf["_id"]:
+                duplicates[str(shelf["_id"])] = (shelf["user_id"], keeper)
+                shelf_writes.append(DeleteOne({"_id": shelf["_id"]}))
+                continue
+            name = ShelfService.default_shelf_name(MediaType(shelf["media_type"]), ShelfStatus(shelf["status"]))
+            if name and name != shelf["name"]:
+                shelf_writes.append(UpdateOne({"_id": shelf["_id"]}, {"$set": {"name": name}}))
+        if not duplicates:
+            return {"shelves": shelf_writes}
+
+        user_ids = list({user_id for user_id, _ in duplicates.values()})
+        kept_ids = list({str(keeper) for _, keeper in duplicates.values()})
+        on_keeper = {
+            (item["shelf_id"], item["media_id"])
+            async for item in database["shelf_items"].find(
+                {"user_id": {"$in": user_ids}, "shelf_id": {"$in": kept_ids}},
+                {"shelf_id": 1, "media_id": 1}
+            )
+        }
+        item_writes = []
+        async for item in database["shelf_items"].find(
+            {"user_id": {"$in": user_ids}, "shelf_id": {"$in": list(duplicates)}},
+            {"shelf_id": 1, "media_id": 1},
+            sort=[("_id", 1)]
+        ):
+            keeper = str(duplicates[item["shelf_id"]][1])
+            if (keeper, item["media_id"]) in on_keeper:
+                item_writes.append(DeleteOne({"_id": item["_id"]}))
+            else:
+                on_keeper.add((keeper, item["media_id"]))
+                item_writes.append(UpdateOne({"_id": item["_id"]}, {"$set": {"shelf_id": keeper}}))
+        now = datetime.utcnow()
+        shelf_writes.extend(
+            UpdateOne({"_id": keeper}, {"$set": {"updated_at": now}})
+            for keeper in {keeper for _, keeper in duplicates.values()}
+        )
+        return {"shelf_items": item_writes, "shelves": shelf_writes}
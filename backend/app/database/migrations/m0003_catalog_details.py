@@ -0,0 +1,24 @@
+# app/database/migrations/m0003_catalog_details.py
+from typing import Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from app.database.migrations.runner import Migration
+
+class CatalogDetailsMigration(Migration):
+    """Drop detail payloads from ``media_catalog``.
+
+    Detail payloads are kept in the media cache only; the catalog holds
+    summary fields. Unsetting is idempotent, so a replayed batch is harmless.
+    """
+    name = "0003_catalog_details"
+    collection = "media_catalog"
+    filter = {"$or": [{"details": {"$exists": True}}, {"details_updated_at": {"$exists": True}}]}
+    projection = {"_id": 1}
+
+    async def plan(self, database: AsyncIOMotorDatabase, batch: List[dict]) -> Dict[str, list]:
+        return {"media_catalog": [
+            UpdateOne({"_id": entry["_id"]}, {"$unset": {"details": "", "details_updated_at": ""}})
+            for entry in batch
+        ]}
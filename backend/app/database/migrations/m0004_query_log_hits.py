@@ -0,0 +1,37 @@
+# app/database/migrations/m0004_query_log_hits.py
+from typing import Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from app.database.migrations.runner import Migration
+
+LEGACY_COUNT_INDEX = "kind_1_count_-1"
+
+class QueryLogHitsMigration(Migration):
+    """Rename ``query_log.count`` to ``hits``.
+
+    Counts are added onto any ``hits`` already recorded since the rename
+    was deployed, in the same update that unsets ``count``, so a replayed
+    batch matches nothing and adds nothing twice.
+    """
+    name = "0004_query_log_hits"
+    collection = "query_log"
+    filter = {"count": {"$exists": True}}
+    projection = {"_id": 1}
+
+    async def plan(self, database: AsyncIOMotorDatabase, batch: List[dict]) -> Dict[str, list]:
+        return {"query_log": [
+            UpdateOne(
+                {"_id": entry["_id"], "count": {"$exists": True}},
+                [
+                    {"$set": {"hits": {"$add": [{"$ifNull": ["$hits", 0]}, "$count"]}}},
+                    {"$project": {"count": 0}}
+                ]
+            )
+            for entry in batch
+        ]}
+
+    async def finalize(self, database: AsyncIOMotorDatabase):
+        if LEGACY_COUNT_INDEX in await database["query_log"].index_information():
+            await database["query_log"].drop_index(LEGACY_COUNT_INDEX)
@@ -0,0 +1,125 @@
+# app/database/migrations/runner.py
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.database.models.migration import MigrationState
+
+logger = logging.getLogger(__name__)
+
+class Migration:
+    """One versioned change to stored documents.
+
+    The runner streams ``collection`` in _id order, restricted to
+    ``filter`` (the documents still needing the change), and hands each
+    batch to ``plan``. Re-running a batch must be harmless: a crash between
+    its writes and its checkpoint replays it.
+    """
+    name: str
+    collection: str
+    filter: dict = {}
+    projection: Optional[dict] = None
+
+    async def plan(self, database: AsyncIOMotorDatabase, batch: List[dict]) -> Dict[str, list]:
+        """Bulk write requests for a batch, per collection, applied in dict order"""
+        raise NotImplementedError
+
+    async def finalize(self, database: AsyncIOMotorDatabase):
+        """Runs once after the last batch (not in dry runs)"""
+
+class Throttle:
+    """Paces writes to ``ops_per_second`` on average; None means unthrottled"""
+
+    def __init__(self, ops_per_second: Optional[float]):
+        self.rate = ops_per_second
+        self._available = time.monotonic()
+
+    async def wait(self, ops: int):
+        if not self.rate or not ops:
+            return
+        self._available = max(self._available, time.monotonic()) + ops / self.rate
+        delay = self._available - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+class MigrationRunner:
+    """Applies migrations in name order, resuming each from its checkpoint.
+
+    Batches are read from a single cursor, written with unordered
+    ``bulk_write`` calls and checkpointed in the ``migrations`` collection.
+    A dry run reads and plans every batch but writes nothing, checkpoint
+    included, and reports what would have been written.
+    """
+
+    def __init__(
+        self,
+        database: AsyncIOMotorDatabase,
+        batch_size: int = 500,
+        ops_per_second: Optional[float] = None,
+        dry_run: bool = False
+    ):
+        self.database = database
+        self.batch_size = batch_size
+        self.throttle = Throttle(ops_per_second)
+        self.dry_run = dry_run
+
+    async def run(self, migrations: List[Migration]) -> List[dict]:
+        return [await self.run_one(migration) for migration in sorted(migrations, key=lambda m: m.name)]
+
+    async def run_one(self, migration: Migration) -> dict:
+        state = await MigrationState.find_one({"name": migration.name})
+        if state is not None and state.status == "done":
+            return {"name": migration.name, "status": "done", "processed": state.processed, "writes": state.writes}
+        if state is None:
+            state = MigrationState(name=migration.name)
+            if not self.dry_run:
+                await state.insert()
+
+        report = {"name": migration.name, "status": "dry_run" if self.dry_run else "running", "processed": 0, "writes": 0}
+        query = dict(migration.filter)
+        if state.last_id is not None:
+            query["_id"] = {"$gt": state.last_id}
+        cursor = self.database[migration.collection].find(
+            query, migration.projection, sort=[("_id", 1)], batch_size=self.batch_size
+        )
+        started = time.monotonic()
+        batch: List[dict] = []
+        async for document in cursor:
+            batch.append(document)
+            if len(batch) == self.batch_size:
+                await self._apply(migration, state, batch, report)
+                batch = []
+        if batch:
+            await self._apply(migration, state, batch, report)
+
+        if not self.dry_run:
+            await migration.finalize(self.database)
+            state.status = report["status"] = "done"
+            state.finished_at = datetime.utcnow()
+            await state.save()
+        logger.info(
+            "Migration %s %s: %d documents, %d writes in %.1fs",
+            migration.name, report["status"], report["processed"], report["writes"], time.monotonic() - started
+        )
+        return report
+
+    async def _apply(self, migration: Migration, state: MigrationState, batch: List[dict], report: dict):
+        writes = await migration.plan(self.database, batch)
+        ops = sum(len(requests) for requests in writes.values())
+        if not self.dry_run:
+            for collection, requests in writes.items():
+                if requests:
+                    await self.database[collection].bulk_write(requests, ordered=False)
+            state.last_id = batch[-1]["_id"]
+            state.processed += len(batch)
+            state.writes += ops
+            state.updated_at = datetime.utcnow()
+            await state.save()
+        report["processed"] += len(batch)
+        report["writes"] += ops
+        logger.info("Migration %s: %d documents so far, last _id %s", migration.name, report["processed"], batch[-1]["_id"])
+        await self.throttle.wait(ops)
@@ -0,0 +1,18 @@
+from typing import Any
+from datetime import datetime
+from beanie import Document
+from pymongo import IndexModel
+
+class MediaCacheEntry(Document):
+    key: str
+    media_type: str
+    value: Any
+    fresh_until: datetime  # Served as-is until then, stale (and refreshed) after
+    expires_at: datetime  # Removed by the TTL index once reached
+
+    class Settings:
+        name = "media_cache"
+        indexes = [
+            IndexModel([("key", 1)], unique=True),
+            IndexModel([("expires_at", 1)], expireAfterSeconds=0),
+        ]
@@ -0,0 +1,22 @@
+from typing import Any, Optional
+from datetime import datetime
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+
+class MigrationState(Document):
+    """Progress of one data migration, checkpointed after every batch"""
+    name: str  # e.g. "0001_shelf_membership"
+    status: str = "running"  # "running" or "done"
+    last_id: Optional[Any] = None  # _id of the last source document handled
+    processed: int = 0
+    writes: int = 0
+    started_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "migrations"
+        indexes = [
+            IndexModel([("name", 1)], unique=True),
+        ]
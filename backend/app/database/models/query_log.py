@@ -0,0 +1,18 @@
+from datetime import datetime
+from beanie import Document
+from pymongo import IndexModel
+
+class QueryStat(Document):
+    """Sampled popularity of a normalized search query or detail id"""
+    kind: str  # "search", "movie", "tv" or "book"
+    key: str  # Normalized query or media id
+    hits: int = 0  # Not "count", which would shadow Document.count()
+    last_seen: datetime
+
+    class Settings:
+        name = "query_log"
+        indexes = [
+            IndexModel([("kind", 1), ("key", 1)], unique=True),
+            IndexModel([("kind", 1), ("hits", -1)]),
+            IndexModel([("last_seen", 1)], expireAfterSeconds=30 * 24 * 3600),
+        ]
@@ -1,18 +1,28 @@
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime
 from beanie import Document, Link
 from pydantic import Field
+from pymongo import IndexModel
 from ..schemas.shelf import MediaType, ShelfType, ShelfStatus
 from enum import Enum
 from .user import User
 
 class MediaItem(Document):
-    media_id: str
+    """Canonical catalog entry, one per (media_type, media_id) across all users"""
+    media_type: MediaType
+    media_id: str  # Provider id (TMDB id or Google Books volume id)
     title: str
-    image_url: Optional[str]
-    creator: Optional[str]
-    year: Optional[int]
+    image_url: Optional[str] = None
+    creator: Optional[str] = None
+    year: Optional[int] = None
     date_added: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "media_catalog"
+        indexes = [
+            IndexModel([("media_type", 1), ("media_id", 1)], unique=True),
+        ]
 
 class ShelfModel(Document):
     user_id: str
@@ -24,14 +34,22 @@ class ShelfModel(Document):
     description: Optional[str] = None
     is_private: bool = False
     has_collaborators: bool = False
-    items: List[str] = []  # List of media IDs
+    # Membership lives in ShelfItemModel; legacy documents may still carry a
+    # stale embedded ``items`` array until migration 0001_shelf_membership drops it
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "shelves"
         indexes = [
-            [("user_id", 1), ("media_type", 1), ("name", 1)],  # Compound index
+            # Listing a user's shelves and finding one by name
+            IndexModel([("user_id", 1), ("media_type", 1), ("name", 1)]),
+            # At most one materialized default shelf per status
+            IndexModel(
+                [("user_id", 1), ("media_type", 1), ("status", 1)],
+                unique=True,
+                partialFilterExpression={"shelf_type": "default"}
+            ),
         ]
 
 class ShelfItemModel(Document):
@@ -39,10 +57,29 @@ class ShelfItemModel(Document):
     shelf_id: str
     media_id: str
     media_type: MediaType
+    # Title and creator are kept as sort keys; display metadata comes from
+    # the MediaItem catalog entry with the same (media_type, media_id)
     title: str
     creator: Optional[str] = None
-    cover_image: Optional[str] = None
-    added_at: datetime = datetime.utcnow()
+    cover_image: Optional[str] = None  # Legacy items only
+    added_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
         name = "shelf_items"
+        indexes = [
+            # An item is on a given shelf at most once; also serves shelf_id lookups
+            IndexModel([("user_id", 1), ("shelf_id", 1), ("media_id", 1)], unique=True),
+            # Shelf contents in added / title / creator order; _id breaks ties
+            # for keyset pagination. Text sorts use TEXT_COLLATION in shelf_service
+            IndexModel([("user_id", 1), ("shelf_id", 1), ("added_at", 1), ("_id", 1)]),
+            IndexModel(
+                [("user_id", 1), ("shelf_id", 1), ("title", 1), ("_id", 1)],
+                collation={"locale": "en", "strength": 2}
+            ),
+            IndexModel(
+                [("user_id", 1), ("shelf_id", 1), ("creator", 1), ("_id", 1)],
+                collation={"locale": "en", "strength": 2}
+            ),
+            # Every shelf entry for a title, e.g. when removing it
+            IndexModel([("user_id", 1), ("media_id", 1)]),
+        ]
@@ -1,19 +1,24 @@
-from beanie import Document, Indexed
-from pydantic import EmailStr
+from beanie import Document
+from pydantic import EmailStr, Field
+from pymongo import IndexModel
 from datetime import datetime
 from typing import Optional
 
 class User(Document):
-    email: EmailStr = Indexed(unique=True)  # Correct syntax
-    username: str = Indexed(unique=True)     # Correct syntax
+    email: EmailStr
+    username: str
     hashed_password: str
     full_name: Optional[str] = None
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = True
     
     class Settings:
         name = "users"
+        indexes = [
+            IndexModel([("email", 1)], unique=True),
+            IndexModel([("username", 1)], unique=True),
+        ]
         
     class Config:
         schema_extra = {
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel, Field
@@ -38,4 +38,21 @@ class MediaItem(BaseModel):
     creator: Optional[str] = None  # Author/Director
     date_added: datetime = Field(default_factory=datetime.utcnow)
     progress: Optional[int] = None  # Page number or episode number
-    notes: Optional[str] = None
\ No newline at end of file
+    notes: Optional[str] = None
+
+class ShelfOperation(BaseModel):
+    """One step of a bulk shelf reorganisation
+
+    add needs shelf_id and title; move needs to_shelf_id (from_shelf_id is
+    only required when the item is on several shelves); remove takes an
+    optional shelf_id and otherwise removes the item from every shelf.
+    """
+    op: Literal["add", "move", "remove"]
+    media_type: MediaType
+    media_id: str
+    shelf_id: Optional[str] = None
+    from_shelf_id: Optional[str] = None
+    to_shelf_id: Optional[str] = None
+    title: Optional[str] = None
+    creator: Optional[str] = None
+    image_url: Optional[str] = None
@@ -0,0 +1,116 @@
+# app/logging_config.py
+import atexit
+import contextvars
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import orjson
+
+# Correlation ID of the request being handled by the current task
+request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+class RequestIdFilter(logging.Filter):
+    """Stamps each record with the current request's correlation ID"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+class DebugSampler(logging.Filter):
+    """Lets through only a fraction of DEBUG records; other levels always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return orjson.dumps(entry).decode()
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that leaves formatting to the listener thread.
+
+    The stock QueueHandler runs the formatter on the caller; here the caller
+    only interpolates the message and renders any traceback, so JSON encoding
+    and the stdout write happen off the event loop.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging(
+    level: str = "INFO",
+    module_levels: Optional[Dict[str, str]] = None,
+    fmt: str = "json",
+    debug_sample_rate: float = 1.0
+):
+    """Route all logging through a queue drained by a background thread
+
+    ``module_levels`` overrides the level per logger name (e.g.
+    ``{"app.services.http_client": "DEBUG"}``). Level checks happen before a
+    record is built, so disabled debug calls cost only a method call.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    handler = DeferredQueueHandler(queue.SimpleQueue())
+    handler.addFilter(RequestIdFilter())
+    if debug_sample_rate < 1.0:
+        handler.addFilter(DebugSampler(debug_sample_rate))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level.upper())
+    for name, module_level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(module_level.upper())
+    # Let uvicorn's loggers share the pipeline instead of their own handlers
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+
+    _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
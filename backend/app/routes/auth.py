@@ -1,13 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends, Header, Request
 from ..database.models.user import User
+from ..database.indexes import index_builder
 from ..services.auth import create_access_token, create_refresh_token, verify_password, get_password_hash, validate_password_strength, is_rate_limited
 from pydantic import BaseModel, EmailStr
 from jose import JWTError, jwt
 import os
 from dotenv import load_dotenv
-from ..services.shelf_service import ShelfService
-from ..database.schemas.shelf import MediaType, ShelfType
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 load_dotenv()
@@ -32,56 +35,36 @@ class PasswordReset(BaseModel):
 @router.post("/signup")
 async def signup(user_data: UserCreate, request: Request):
     try:
-        print(f"Debug - Received signup request for email: {user_data.email}")
-        
         # Validate password strength
         is_valid, error_message = validate_password_strength(user_data.password)
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_message)
         
-        # Check if user exists
-        existing_user = await User.find_one({"email": user_data.email})
-        if existing_user:
-            print(f"Debug - Email already registered: {user_data.email}")
-            raise HTTPException(status_code=400, detail="Email already registered")
-        
-        # Also check for username uniqueness
-        existing_username = await User.find_one({"username": user_data.username})
-        if existing_username:
-            print(f"Debug - Username already taken: {user_data.username}")
-            raise HTTPException(status_code=400, detail="Username already taken")
-        
-        # Create user
-        print("Debug - Creating new user")
+        # The unique email/username indexes reject duplicates; until both are
+        # confirmed built (e.g. the build failed on existing duplicates), check first
+        if not index_builder.is_built(User):
+            if await User.find_one({"email": user_data.email}):
+                raise HTTPException(status_code=400, detail="Email already registered")
+            if await User.find_one({"username": user_data.username}):
+                raise HTTPException(status_code=400, detail="Username already taken")
+
         user = User(
             email=user_data.email,
             username=user_data.username,
             hashed_password=get_password_hash(user_data.password)
         )
-        print("Debug - Saving user to database")
-        await user.save()
-        
-        # Create default shelves for each media type
-        print(f"Debug - Creating default shelves for user ID: {str(user.id)}")
-        media_types = [
-            MediaType.BOOK,
-            MediaType.MOVIE,
-            MediaType.TV_SHOW,
-            MediaType.ARTICLE
-        ]
-        
-        for media_type in media_types:
-            await ShelfService.create_default_shelves(
-                user_id=str(user.id),
-                media_type=media_type
-            )
+        try:
+            await user.insert()
+        except DuplicateKeyError as e:
+            if "username" in (e.details or {}).get("keyPattern", {}):
+                raise HTTPException(status_code=400, detail="Username already taken")
+            raise HTTPException(status_code=400, detail="Email already registered")
         
+        # No shelves to create: default shelves stay virtual until first used
         # Create tokens
-        print("Debug - Creating access and refresh tokens")
         access_token = create_access_token({"sub": str(user.id)})
         refresh_token = create_refresh_token({"sub": str(user.id)})
         
-        print("Debug - Signup successful")
         return {
             "access_token": access_token,
             "refresh_token": refresh_token,
@@ -97,10 +80,7 @@ async def signup(user_data: UserCreate, request: Request):
         # Re-raise HTTP exceptions as they're already properly formatted
         raise he
     except Exception as e:
-        print(f"Debug - Error in signup: {str(e)}")
-        print(f"Debug - Error type: {type(e)}")
-        import traceback
-        print(f"Debug - Traceback: {traceback.format_exc()}")
+        logger.exception("Signup failed")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.post("/login")
@@ -116,28 +96,17 @@ async def login(user_data: UserLogin, request: Request):
             detail=f"Too many login attempts. Please try again in {wait_time} seconds."
         )
     
-    print(f"Debug - Login attempt for email: {user_data.email}")
-    
-    # Log the incoming password length
-    print(f"Debug - Received password length: {len(user_data.password)}")
-    
     user = await User.find_one({"email": user_data.email})
-    print(f"Debug - Found user: {user is not None}")
-    
-    if user:
-        print(f"Debug - User details: id={user.id}, email={user.email}")
-        print(f"Debug - Stored hashed password: {user.hashed_password}")
     
     if not user:
-        print("Debug - User not found")
+        logger.info("Login failed from %s: unknown email", client_ip)
         # Use same error message for security (don't reveal if email exists)
         raise HTTPException(status_code=400, detail="Invalid email or password")
         
     is_valid = verify_password(user_data.password, user.hashed_password)
-    print(f"Debug - Password verification result: {is_valid}")
     
     if not is_valid:
-        print("Debug - Invalid password")
+        logger.info("Login failed from %s for user %s: invalid password", client_ip, user.id)
         # Check rate limiting again after failed attempt
         is_limited, wait_time = is_rate_limited(client_ip, user_data.email)
         if is_limited:
@@ -150,7 +119,7 @@ async def login(user_data: UserLogin, request: Request):
     # Create tokens
     access_token = create_access_token({"sub": str(user.id)})
     refresh_token = create_refresh_token({"sub": str(user.id)})
-    print("Debug - Created access and refresh tokens")
+    logger.debug("Login succeeded for user %s", user.id)
     
     response_data = {
         "access_token": access_token, 
@@ -162,7 +131,6 @@ async def login(user_data: UserLogin, request: Request):
             "username": user.username
         }
     }
-    print(f"Debug - Sending response: {response_data}")
     return response_data
 
 @router.get("/me")
@@ -196,7 +164,7 @@ async def test_db():
         count = await User.count()
         return {"message": "Database connection successful", "user_count": count}
     except Exception as e:
-        print(f"Database connection error: {str(e)}")
+        logger.error("Database connection error: %s", e)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 @router.post("/refresh-token")
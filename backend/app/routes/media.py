@@ -1,14 +1,28 @@
 # app/routes/media.py
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import logging
+import time
+from typing import Dict, List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from fastapi.responses import FileResponse, StreamingResponse
 import httpx
+import orjson
 from pydantic import BaseModel
 from config import Settings
 from app.services.shelf_service import ShelfService
 from app.services.auth import get_current_user
+from app.services.etag import RenderedJSON, etag_matches, json_response
+from app.services.image_cache import image_cache, normalize_image_url
+from app.services import media_details, media_search
+from app.services.cache_warmer import query_log
 
 router = APIRouter()
 settings = Settings()
+logger = logging.getLogger(__name__)
+
+# Detail responses may be cached anywhere but must be revalidated (cheap: a
+# cache hit plus an ETag comparison) so refreshed metadata shows up
+DETAIL_CACHE_CONTROL = "public, no-cache"
 
 class SearchResult(BaseModel):
     id: str
@@ -23,10 +37,28 @@ class GroupedSearchResults(BaseModel):
     tv_shows: List[SearchResult]
     books: List[SearchResult]
     articles: List[SearchResult] = []
+    # Per-group outcome: "ok", "timeout" or "error"
+    status: Dict[str, str] = {}
+    partial: bool = False
+
+class BatchItem(BaseModel):
+    media_type: Literal["movie", "tv", "book"]
+    id: str
+
+class BatchDetailsRequest(BaseModel):
+    items: List[BatchItem]
+    # Applied to movie/TV items, as on the single detail endpoints
+    include: Optional[str] = None
+    fields: Optional[str] = None
 
 @router.get("/search/quick")  
 async def search_quick(query: str):
-    """Quick search across all media types"""
+    """Quick search across all media types
+
+    Each group reports its outcome in ``status``; ``partial`` is set when any
+    group timed out or failed upstream.
+    """
+    query = media_search.normalize_query(query)
     if not query or len(query) < 2:
         return {
             "movies": [],
@@ -35,172 +67,105 @@ async def search_quick(query: str):
             "articles": []
         }
     
-    try:
-        async with httpx.AsyncClient() as client:
-            # Search movies
-            movie_response = await client.get(
-                f"{settings.TMDB_BASE_URL}/search/movie",
-                params={
-                    "api_key": settings.TMDB_API_KEY,
-                    "query": query,
-                    "language": "en-US",
-                    "page": 1
-                }
-            )
-            movie_data = movie_response.json()
-            
-            # Search TV shows
-            tv_response = await client.get(
-                f"{settings.TMDB_BASE_URL}/search/tv",
-                params={
-                    "api_key": settings.TMDB_API_KEY,
-                    "query": query,
-                    "language": "en-US",
-                    "page": 1
-                }
-            )
-            tv_data = tv_response.json()
-            
-            # Search books
-            book_response = await client.get(
-                f"{settings.GOOGLE_BOOKS_BASE_URL}/volumes",
-                params={
-                    "q": query,
-                    "maxResults": 5
-                }
-            )
-            book_data = book_response.json()
+    query_log.record("search", query)
+    results = {}
+    status = {}
+    async for group, items, group_status in media_search.iter_search_groups(query):
+        results[group] = items
+        status[group] = group_status
 
-        return {
-            "movies": [
-                {
-                    "id": str(item["id"]),
-                    "title": item["title"],
-                    "subtitle": item.get("release_date", "")[:4] if item.get("release_date") else None,
-                    "image_url": f"https://image.tmdb.org/t/p/w92{item['poster_path']}" if item.get("poster_path") else None,
-                    "type": "movie"
-                }
-                for item in movie_data.get("results", [])[:5]
-            ],
-            "tv_shows": [
-                {
-                    "id": str(item["id"]),
-                    "title": item["name"],
-                    "subtitle": item.get("first_air_date", "")[:4] if item.get("first_air_date") else None,
-                    "image_url": f"https://image.tmdb.org/t/p/w92{item['poster_path']}" if item.get("poster_path") else None,
-                    "type": "tv"
-                }
-                for item in tv_data.get("results", [])[:5]
-            ],
-            "books": [
-                {
-                    "id": item.get("id", ""),
-                    "title": item.get("volumeInfo", {}).get("title", "Unknown Title"),
-                    "subtitle": item.get("volumeInfo", {}).get("authors", [""])[0] if item.get("volumeInfo", {}).get("authors") else None,
-                    "image_url": item.get("volumeInfo", {}).get("imageLinks", {}).get("thumbnail"),
-                    "type": "book"
-                }
-                for item in book_data.get("items", [])[:5]
-            ],
-            "articles": []  # Empty for now
-        }
-            
-    except Exception as e:
-        print(f"Search error: {str(e)}")
+    return {
+        **results,
+        "articles": [],  # Empty for now
+        "status": status,
+        "partial": any(group_status != "ok" for group_status in status.values())
+    }
+
+def _ndjson_frame(event: str, payload: dict) -> bytes:
+    return orjson.dumps({"event": event, **payload}) + b"\n"
+
+def _sse_frame(event: str, payload: dict) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(payload) + b"\n\n"
+
+STREAM_FORMATS = {
+    "ndjson": ("application/x-ndjson", _ndjson_frame),
+    "sse": ("text/event-stream", _sse_frame),
+}
+
+@router.get("/search/quick/stream")
+async def search_quick_stream(query: str, format: str = "ndjson"):
+    """Quick search that flushes each media group as soon as it arrives
+
+    Emits one "group" frame per media group, in completion order, followed by
+    a "summary" frame with the per-group status. ``format`` is ``ndjson``
+    (default) or ``sse``.
+    """
+    if format not in STREAM_FORMATS:
         raise HTTPException(
-            status_code=500,
-            detail=f"Search failed: {str(e)}"
+            status_code=400,
+            detail=f"Invalid format: {format}. Expected one of {list(STREAM_FORMATS)}"
         )
+    media_type, frame = STREAM_FORMATS[format]
+    query = media_search.normalize_query(query)
+
+    async def stream():
+        started = time.monotonic()
+        status = {}
+        if query and len(query) >= 2:
+            query_log.record("search", query)
+            async for group, items, group_status in media_search.iter_search_groups(query):
+                status[group] = group_status
+                yield frame("group", {"group": group, "status": group_status, "results": items})
+        yield frame("summary", {
+            "status": status,
+            "partial": any(group_status != "ok" for group_status in status.values()),
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1)
+        })
+
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/books/{book_id}")
-async def get_book_details(book_id: str):
+async def get_book_details(book_id: str, if_none_match: Optional[str] = Header(None)):
+    query_log.record("book", book_id)
     try:
-        print(f"Fetching book details for ID: {book_id}")
-        url = f"{settings.GOOGLE_BOOKS_BASE_URL}/volumes/{book_id}"
-        print(f"Making request to URL: {url}") 
-        
-        async with httpx.AsyncClient() as client:
-           
-            headers = {
-                "Accept": "application/json",
-                "User-Agent": "Shelfd/1.0"
-            }
-            response = await client.get(url, headers=headers)
-            print(f"Response status: {response.status_code}")
-            print(f"Response headers: {dict(response.headers)}")  
-            print(f"Response body: {response.text}") 
-            
-            if response.status_code == 404:
-                print(f"Book not found: {book_id}") 
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Book with ID {book_id} not found"
-                )
-            
-            if not response.is_success:
-                print(f"API error: {response.text}")  
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Google Books API error: {response.text}"
-                )
-            
-            data = response.json()
-            volume_info = data.get("volumeInfo", {})
-            
-       
-            book_data = {
-                "id": data["id"],
-                "title": volume_info.get("title", "Unknown Title"),
-                "author": ", ".join(volume_info.get("authors", ["Unknown Author"])),
-                "description": volume_info.get("description", "No description available"),
-                "rating": volume_info.get("averageRating"),
-                "tags": volume_info.get("categories", []),
-                "image_url": volume_info.get("imageLinks", {}).get("thumbnail"),
-                "publishedDate": volume_info.get("publishedDate"),
-                "pageCount": volume_info.get("pageCount"),
-                "language": volume_info.get("language"),
-                "previewLink": volume_info.get("previewLink")
-            }
-            
-            print(f"Transformed book data: {book_data}") 
-            return book_data
-            
+        book = await media_details.get_book_details(book_id)
+        return json_response(RenderedJSON(book), if_none_match, DETAIL_CACHE_CONTROL)
+    except HTTPException:
+        raise
     except httpx.HTTPError as e:
-        print(f"HTTP Error occurred: {str(e)}")
+        logger.warning("Google Books request failed for %s: %s", book_id, e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to fetch book from Google Books API: {str(e)}"
         )
     except Exception as e:
-        print(f"Unexpected error: {str(e)}")
+        logger.exception("Unexpected error fetching book %s", book_id)
         raise HTTPException(
             status_code=500,
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
 @router.get("/tv/{tv_id}")
-async def get_tv_details(tv_id: int):
-    """Fetch TV show details from TMDB API"""
+async def get_tv_details(
+    tv_id: int,
+    include: Optional[str] = None,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Fetch TV show details from TMDB API
+
+    With ``include`` (credits, videos, similar, recommendations) and/or
+    ``fields``, returns the compact normalized record instead of raw TMDB JSON.
+    """
+    sections, field_list = media_details.parse_projection(include, fields) or (None, None)
     try:
-        print(f"[TV Details Backend] Fetching TV show details for ID: {tv_id}")
-        url = f"{settings.TMDB_BASE_URL}/tv/{tv_id}"
-        params = {
-            "api_key": settings.TMDB_API_KEY,
-            "append_to_response": "credits,videos,similar,recommendations"
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            
-            if response.status_code == 404:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"TV show with ID {tv_id} not found"
-                )
-            
-            response.raise_for_status()
-            return response.json()
-            
+        query_log.record("tv", str(tv_id))
+        show = await media_details.get_tmdb_details("tv", tv_id, sections=sections, fields=field_list)
+        return json_response(RenderedJSON(show), if_none_match, DETAIL_CACHE_CONTROL)
     except httpx.HTTPError as e:
         raise HTTPException(
             status_code=500,
@@ -208,49 +173,107 @@ async def get_tv_details(tv_id: int):
         )
 
 @router.get("/movies/{movie_id}")
-async def get_movie_details(movie_id: int):
-    """Fetch movie details from TMDB API"""
+async def get_movie_details(
+    movie_id: int,
+    include: Optional[str] = None,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Fetch movie details from TMDB API
+
+    With ``include`` (credits, videos, similar, recommendations) and/or
+    ``fields``, returns the compact normalized record instead of raw TMDB JSON.
+    """
+    sections, field_list = media_details.parse_projection(include, fields) or (None, None)
     try:
-        print(f"[Movie Details Backend] Fetching movie details for ID: {movie_id}")
-        url = f"{settings.TMDB_BASE_URL}/movie/{movie_id}"
-        params = {
-            "api_key": settings.TMDB_API_KEY,
-            "append_to_response": "credits,videos,similar,recommendations"
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            
-            if response.status_code == 404:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Movie with ID {movie_id} not found"
-                )
-            
-            response.raise_for_status()
-            return response.json()
-            
+        query_log.record("movie", str(movie_id))
+        movie = await media_details.get_tmdb_details("movie", movie_id, sections=sections, fields=field_list)
+        return json_response(RenderedJSON(movie), if_none_match, DETAIL_CACHE_CONTROL)
     except httpx.HTTPError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching movie details: {str(e)}"
         )
 
+@router.post("/batch")
+async def get_batch_details(request: BatchDetailsRequest):
+    """Fetch details for many (media_type, id) pairs in one round trip
+
+    Items are served from the cache where possible; the rest are fetched
+    upstream with at most MEDIA_BATCH_CONCURRENCY requests in flight. Returns
+    a map keyed by "media_type:id" where each entry has either ``data`` or
+    an ``error`` with its HTTP status.
+    """
+    if len(request.items) > settings.MEDIA_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many items: {len(request.items)} (max {settings.MEDIA_BATCH_MAX_ITEMS})"
+        )
+    sections, field_list = media_details.parse_projection(request.include, request.fields) or (None, None)
+    limit = asyncio.Semaphore(settings.MEDIA_BATCH_CONCURRENCY)
+
+    async def _resolve(item: BatchItem) -> dict:
+        try:
+            if item.media_type == "book":
+                data = await media_details.get_book_details(item.id, limit=limit)
+            else:
+                if not item.id.isdigit():
+                    raise HTTPException(status_code=400, detail=f"Invalid TMDB id: {item.id}")
+                data = await media_details.get_tmdb_details(
+                    item.media_type, int(item.id), sections=sections, fields=field_list, limit=limit
+                )
+            return {"status": 200, "data": data}
+        except HTTPException as e:
+            return {"status": e.status_code, "error": e.detail}
+        except Exception as e:
+            logger.exception("Batch item error (%s:%s)", item.media_type, item.id)
+            return {"status": 500, "error": str(e)}
+
+    unique = {f"{item.media_type}:{item.id}": item for item in request.items}
+    results = await asyncio.gather(*(_resolve(item) for item in unique.values()))
+    return {"items": dict(zip(unique, results))}
+
+@router.get("/images")
+async def get_image(
+    url: str,
+    size: str = "medium",
+    if_none_match: Optional[str] = Header(None)
+):
+    """Proxy a TMDB / Google Books cover at a normalized size
+
+    Images are fetched once into the on-disk cache and served from there
+    with long-lived immutable cache headers.
+    """
+    normalized = normalize_image_url(url, size)
+    try:
+        path, content_type, digest = await image_cache.get(normalized)
+    except httpx.HTTPError as e:
+        logger.warning("Image fetch failed for %s: %s", normalized, e)
+        raise HTTPException(status_code=502, detail=f"Image upstream error: {e.__class__.__name__}")
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{digest}"'
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=content_type, headers=headers)
+
 @router.get("/shelves/user/{media_type}")
 async def get_user_shelves(
     media_type: str,
+    summary: bool = False,
+    covers: int = Query(settings.SHELF_SUMMARY_COVERS, ge=1, le=settings.SHELF_SUMMARY_MAX_COVERS),
+    if_none_match: Optional[str] = Header(None),
     current_user: str = Depends(get_current_user)
 ):
-    print(f"Debug - Received media_type: {media_type}")
-    print(f"Debug - Current user: {current_user}")
-    
     try:
-        shelves = await ShelfService.get_user_shelves(
+        shelves = await ShelfService.render_user_shelves(
             user_id=current_user,
-            media_type=media_type
+            media_type=media_type,
+            summary=summary,
+            cover_count=covers
         )
-        print(f"Debug - Found shelves: {shelves}")
-        return shelves
+        return json_response(shelves, if_none_match, "private, no-cache")
     except Exception as e:
-        print(f"Debug - Error getting shelves: {str(e)}")
+        logger.warning("Failed to list %s shelves for user %s: %s", media_type, current_user, e)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
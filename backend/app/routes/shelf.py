@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
-from typing import List, Optional
-from ..database.models.shelf import ShelfModel, ShelfItemModel, MediaType, ShelfType
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from typing import List, Literal, Optional
+from ..database.models.shelf import MediaType, ShelfType
+from ..database.schemas.shelf import ShelfOperation
+from ..services.etag import json_response
 from ..services.shelf_service import ShelfService
 from ..services.auth import get_current_user, oauth2_scheme
 from pydantic import BaseModel
+from config import Settings
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
+settings = Settings()
 
 class CreateCustomShelfRequest(BaseModel):
     name: str
@@ -14,6 +21,9 @@ class CreateCustomShelfRequest(BaseModel):
     is_private: bool = False
     has_collaborators: bool = False
 
+class BulkShelfRequest(BaseModel):
+    operations: List[ShelfOperation]
+
 @router.post("/create_default")
 async def create_default_shelves(token: str = Depends(oauth2_scheme)):
     try:
@@ -26,54 +36,43 @@ async def create_default_shelves(token: str = Depends(oauth2_scheme)):
 @router.get("/user/{media_type}")
 async def get_user_shelves(
     media_type: MediaType,
+    summary: bool = False,
+    covers: int = Query(settings.SHELF_SUMMARY_COVERS, ge=1, le=settings.SHELF_SUMMARY_MAX_COVERS),
+    if_none_match: Optional[str] = Header(None),
     token: str = Depends(oauth2_scheme)
 ):
+    """A user's shelves; ``summary=true`` returns counts and the newest ``covers`` items per shelf
+
+    Responses carry a strong ETag; a matching If-None-Match gets a 304,
+    straight from the shelf cache when the listing is cached.
+    """
     try:
-        # Debug logging
-        print(f"Debug - Received media_type: {media_type}")
-        print(f"Debug - Valid media types: {[m.value for m in MediaType]}")
-        
         user_id = await get_current_user(token)
-        shelves = await ShelfService.get_user_shelves(user_id, media_type)
-        
-        if not shelves:
-            return []
-            
-        # Transform the data to match frontend expectations
-        transformed_shelves = []
-        for shelf in shelves:
-            shelf_dict = {
-                "_id": str(shelf.id),
-                "name": shelf.name,
-                "shelf_type": shelf.shelf_type,
-                "items": []
-            }
-            
-            # Get items for this shelf
-            shelf_items = await ShelfItemModel.find({
-                "user_id": user_id,
-                "shelf_id": str(shelf.id)
-            }).to_list()
-            
-            shelf_dict["items"] = [
-                {
-                    "media_id": item.media_id,
-                    "title": item.title,
-                    "cover_image": item.cover_image,
-                    "creator": item.creator,
-                    "added_at": item.added_at.isoformat() if item.added_at else None
-                }
-                for item in shelf_items
-            ]
-            
-            transformed_shelves.append(shelf_dict)
-            
-        return transformed_shelves
-        
+        shelves = await ShelfService.render_user_shelves(user_id, media_type, summary=summary, cover_count=covers)
+        return json_response(shelves, if_none_match, "private, no-cache")
     except Exception as e:
-        print("Debug - Exception:", str(e))
+        logger.warning("Failed to list %s shelves: %s", media_type, e)
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/{shelf_id}/items")
+async def get_shelf_items(
+    shelf_id: str,
+    sort: Literal["added_at", "title", "creator"] = "added_at",
+    order: Literal["asc", "desc"] = "asc",
+    limit: int = Query(settings.SHELF_PAGE_DEFAULT_LIMIT, ge=1, le=settings.SHELF_PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    token: str = Depends(oauth2_scheme)
+):
+    """One page of a shelf's items; pass ``next_cursor`` back for the next page"""
+    user_id = await get_current_user(token)
+    try:
+        page = await ShelfService.get_shelf_items(
+            user_id, shelf_id, sort=sort, descending=order == "desc", limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**page, "sort": sort, "order": order}
+
 @router.post("/add_item")
 async def add_to_shelf(
     shelf_item: dict,
@@ -99,9 +98,7 @@ async def add_to_shelf(
         
         try:
             media_type_str = shelf_item["media_type"].upper()
-            print("Debug - Media Type String:", media_type_str)  # Add debug logging
             media_type = MediaType[media_type_str]
-            print("Debug - Converted Media Type:", media_type)  # Add debug logging
             
             if "shelf_id" in shelf_item:
                 # Adding to a custom shelf
@@ -117,9 +114,8 @@ async def add_to_shelf(
             else:
                 # Adding to a default shelf
                 shelf_type_str = shelf_item["shelf_type"]
-                print("Debug - Shelf Type String:", shelf_type_str)  # Add debug logging
                 shelf_type = ShelfType[shelf_type_str]
-                print("Debug - Converted Shelf Type:", shelf_type)  # Add debug logging
+                logger.debug("Adding %s %s to %s shelf", media_type, shelf_item["media_id"], shelf_type)
                 
                 result = await ShelfService.add_item_to_shelf(
                     user_id=user_id,
@@ -143,12 +139,36 @@ async def add_to_shelf(
                 detail=f"Value error: {str(e)}"
             )
     except Exception as e:
-        print("Debug - Exception:", str(e))  # Add debug logging
+        logger.warning("Failed to add item to shelf: %s", e)
         raise HTTPException(
             status_code=400,
             detail=f"Error processing request: {str(e)}"
         )
     
+@router.post("/bulk")
+async def bulk_shelf_operations(
+    request: BulkShelfRequest,
+    token: str = Depends(oauth2_scheme)
+):
+    """Apply a batch of add/move/remove operations for the current user
+
+    Operations are validated together and written with unordered bulk
+    writes. ``results`` has one entry per operation, in request order.
+    """
+    if len(request.operations) > settings.SHELF_BULK_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many operations: {len(request.operations)} (max {settings.SHELF_BULK_MAX_OPERATIONS})"
+        )
+    user_id = await get_current_user(token)
+    try:
+        results = await ShelfService.apply_operations(user_id, request.operations)
+    except Exception as e:
+        logger.exception("Bulk shelf operations failed for user %s", user_id)
+        raise HTTPException(status_code=500, detail=str(e))
+    applied = sum(result["status"] == "ok" for result in results)
+    return {"applied": applied, "failed": len(results) - applied, "results": results}
+
 @router.post("/move_item")
 async def move_shelf_item(
     move_data: dict,
@@ -156,13 +176,13 @@ async def move_shelf_item(
 ):
     try:
         user_id = await get_current_user(token)
-        await ShelfService.move_item(
+        shelf = await ShelfService.move_item(
             user_id=user_id,
             media_type=move_data["media_type"],
             media_id=move_data["media_id"],
             new_status=move_data["new_status"]
         )
-        return {"message": "Item moved successfully"}
+        return {"message": "Item moved successfully", "shelf_id": str(shelf.id)}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -173,9 +193,8 @@ async def remove_from_shelf(
     token: str = Depends(oauth2_scheme)
 ):
     try:
-        print(f"Debug - Attempting to remove item: media_type={media_type}, media_id={media_id}")
         user_id = await get_current_user(token)
-        print(f"Debug - User ID: {user_id}")
+        logger.debug("Removing %s/%s for user %s", media_type, media_id, user_id)
         
         # Convert media_type string to enum using the same logic as add_item
         try:
@@ -191,9 +210,7 @@ async def remove_from_shelf(
                 raise KeyError(f"Unknown media type: {media_type}")
                 
             media_type_enum = MediaType[media_type_str]
-            print(f"Debug - Converted media type to: {media_type_enum}")
         except KeyError:
-            print(f"Debug - Invalid media type: {media_type}")
             raise HTTPException(
                 status_code=400,
                 detail=f"Invalid media type: {media_type}"
@@ -204,13 +221,11 @@ async def remove_from_shelf(
             media_id=media_id,
             shelf_type=media_type_enum
         )
-        print("Debug - Successfully removed item")
         return {"message": "Item removed successfully"}
     except ValueError as e:
-        print(f"Debug - ValueError: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"Debug - Unexpected error: {str(e)}")
+        logger.exception("Failed to remove %s/%s", media_type, media_id)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/custom")
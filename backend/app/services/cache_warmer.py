@@ -0,0 +1,155 @@
+# app/services/cache_warmer.py
+import asyncio
+import logging
+import random
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from config import Settings
+from app.database.models.query_log import QueryStat
+from app.services import media_details, media_search
+from app.services.rate_limiter import request_priority, BACKGROUND
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+DETAIL_KINDS = ("movie", "tv", "book")
+
+class QueryLog:
+    """Sampled in-memory counts of searches and detail views.
+
+    Only a fraction of events is recorded (QUERY_LOG_SAMPLE_RATE), and
+    counts are flushed to Mongo periodically in one bulk write, so the
+    request path only pays for a random() call and a dict increment.
+    """
+
+    def __init__(self, sample_rate: float):
+        self.sample_rate = sample_rate
+        self._counts: Counter = Counter()
+        self.recorded = 0
+        self.flushed = 0
+
+    def record(self, kind: str, key: str):
+        if random.random() >= self.sample_rate:
+            return
+        self._counts[(kind, key)] += 1
+        self.recorded += 1
+
+    async def flush(self):
+        """Write pending counts; counts whose write failed stay pending for the next flush"""
+        if not self._counts:
+            return
+        counts, self._counts = self._counts, Counter()
+        keys = list(counts)
+        now = datetime.utcnow()
+        try:
+            await QueryStat.get_motor_collection().bulk_write(
+                [
+                    UpdateOne(
+                        {"kind": kind, "key": key},
+                        {"$inc": {"hits": counts[(kind, key)]}, "$set": {"last_seen": now}},
+                        upsert=True
+                    )
+                    for kind, key in keys
+                ],
+                ordered=False
+            )
+        except BulkWriteError as e:
+            # The other writes were applied; re-queue just the failed ones
+            failed = [keys[error["index"]] for error in e.details.get("writeErrors", [])]
+            self._counts.update({key: counts[key] for key in failed})
+            self.flushed += len(keys) - len(failed)
+            raise
+        except BaseException:
+            # Unknown how much was applied (or cancelled mid-write); re-queue
+            # everything, risking a double count over losing the counts
+            self._counts.update(counts)
+            raise
+        self.flushed += len(keys)
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "pending": len(self._counts),
+            "recorded": self.recorded,
+            "flushed": self.flushed
+        }
+
+query_log = QueryLog(settings.QUERY_LOG_SAMPLE_RATE)
+
+async def top_queries(kind: str, limit: int) -> List[str]:
+    stats = await QueryStat.find({"kind": kind}).sort("-hits").limit(limit).to_list()
+    return [stat.key for stat in stats]
+
+class CacheWarmer:
+    """Pre-fetches the most popular searches and titles in the background.
+
+    Runs at background priority with a small concurrency cap, so it only
+    uses upstream capacity that interactive requests leave unused.
+    """
+
+    def __init__(self):
+        self.runs = 0
+        self.warmed = 0
+        self.failed = 0
+        self.last_run: Optional[datetime] = None
+
+    async def warm_once(self):
+        request_priority.set(BACKGROUND)
+        jobs: List[Tuple[str, str]] = [
+            ("search", query) for query in await top_queries("search", settings.WARM_TOP_K_QUERIES)
+        ]
+        for kind in DETAIL_KINDS:
+            jobs += [(kind, key) for key in await top_queries(kind, settings.WARM_TOP_K_TITLES)]
+
+        limit = asyncio.Semaphore(settings.WARM_CONCURRENCY)
+
+        async def _warm(kind: str, key: str):
+            async with limit:
+                try:
+                    if kind == "search":
+                        async for _ in media_search.iter_search_groups(key):
+                            pass
+                    elif kind == "book":
+                        await media_details.get_book_details(key)
+                    else:
+                        await media_details.get_tmdb_details(kind, int(key))
+                    self.warmed += 1
+                except Exception as e:
+                    self.failed += 1
+                    logger.warning("Cache warm failed for %s:%s: %s", kind, key, e)
+
+        await asyncio.gather(*(_warm(kind, key) for kind, key in jobs))
+        self.runs += 1
+        self.last_run = datetime.utcnow()
+
+    async def run_forever(self):
+        """Flush the query log and re-warm on a schedule; never raises"""
+        await asyncio.sleep(settings.WARM_STARTUP_DELAY_SECONDS)
+        elapsed = settings.WARM_INTERVAL_SECONDS
+        while True:
+            try:
+                await query_log.flush()
+                if elapsed >= settings.WARM_INTERVAL_SECONDS:
+                    elapsed = 0
+                    await self.warm_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cache warmer error")
+            await asyncio.sleep(settings.QUERY_LOG_FLUSH_SECONDS)
+            elapsed += settings.QUERY_LOG_FLUSH_SECONDS
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "runs": self.runs,
+            "warmed": self.warmed,
+            "failed": self.failed,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "query_log": query_log.stats()
+        }
+
+cache_warmer = CacheWarmer()
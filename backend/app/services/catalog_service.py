@@ -0,0 +1,116 @@
+from ..database.models.shelf import MediaItem
+from ..database.schemas.shelf import MediaType
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from pymongo import UpdateOne
+
+# Detail route kind -> catalog media type
+DETAIL_MEDIA_TYPES = {
+    "movie": MediaType.MOVIE,
+    "tv": MediaType.TV_SHOW,
+    "book": MediaType.BOOK,
+}
+
+def parse_year(date: Optional[str]) -> Optional[int]:
+    if date and date[:4].isdigit():
+        return int(date[:4])
+    return None
+
+def catalog_key_filter(media_type: MediaType, media_id: str) -> dict:
+    return {"media_type": media_type.value, "media_id": media_id}
+
+def catalog_many_filter(media_type: MediaType, media_ids: List[str]) -> dict:
+    return {"media_type": media_type.value, "media_id": {"$in": list(set(media_ids))}}
+
+def _upsert_operation(
+    media_type: MediaType,
+    media_id: str,
+    title: str,
+    creator: Optional[str] = None,
+    image_url: Optional[str] = None,
+    year: Optional[int] = None,
+    overwrite: bool = True
+) -> Tuple[dict, dict]:
+    """Filter and update document for upserting one catalog entry"""
+    now = datetime.utcnow()
+    metadata = {
+        key: value
+        for key, value in {
+            "title": title,
+            "creator": creator,
+            "image_url": image_url,
+            "year": year,
+        }.items()
+        if value is not None
+    }
+    on_insert = {"date_added": now}
+    update_fields = {"updated_at": now}
+    if overwrite:
+        update_fields.update(metadata)
+    else:
+        on_insert.update(metadata)
+
+    return catalog_key_filter(media_type, media_id), {"$set": update_fields, "$setOnInsert": on_insert}
+
+class CatalogService:
+    """Shared media catalog: one metadata record per title for all users
+
+    Only summary fields are kept here; full detail payloads live in the
+    media cache (memory and Mongo tiers, served stale while refreshing).
+    """
+
+    @staticmethod
+    async def upsert(
+        media_type: MediaType,
+        media_id: str,
+        title: str,
+        creator: Optional[str] = None,
+        image_url: Optional[str] = None,
+        year: Optional[int] = None,
+        overwrite: bool = True
+    ) -> None:
+        """Create or update a catalog entry in one atomic round trip
+
+        With ``overwrite`` (upstream detail fetches) the given metadata
+        replaces what is stored; otherwise (e.g. shelving from a search hit)
+        it only fills in a new entry.
+        """
+        await MediaItem.get_motor_collection().update_one(
+            *_upsert_operation(media_type, media_id, title, creator, image_url, year, overwrite),
+            upsert=True
+        )
+
+    @staticmethod
+    async def upsert_many(entries: List[dict], overwrite: bool = False) -> None:
+        """Upsert several catalog entries (dicts of upsert's arguments) in one unordered bulk write"""
+        if not entries:
+            return
+        await MediaItem.get_motor_collection().bulk_write(
+            [
+                UpdateOne(*_upsert_operation(overwrite=overwrite, **entry), upsert=True)
+                for entry in entries
+            ],
+            ordered=False
+        )
+
+    @staticmethod
+    async def get_many(media_type: MediaType, media_ids: List[str]) -> Dict[str, dict]:
+        """Catalog summaries keyed by media_id"""
+        if not media_ids:
+            return {}
+        # Entries not yet cleaned by 0003_catalog_details may still hold a payload
+        cursor = MediaItem.get_motor_collection().find(catalog_many_filter(media_type, media_ids), {"details": 0})
+        return {entry["media_id"]: entry async for entry in cursor}
+
+    @staticmethod
+    async def attach(media_type: MediaType, items: List[dict]) -> List[dict]:
+        """Overlay catalog title/creator/cover onto shelf item dicts in one query"""
+        catalog = await CatalogService.get_many(media_type, [item["media_id"] for item in items])
+        for item in items:
+            entry = catalog.get(item["media_id"])
+            if entry is None:
+                continue
+            item["title"] = entry.get("title") or item.get("title")
+            item["creator"] = entry.get("creator") or item.get("creator")
+            item["cover_image"] = entry.get("image_url") or item.get("cover_image")
+        return items
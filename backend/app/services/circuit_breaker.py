@@ -0,0 +1,96 @@
+# app/services/circuit_breaker.py
+import logging
+import time
+from collections import Counter
+
+from config import Settings
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open)")
+        self.name = name
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Per-provider circuit breaker.
+
+    Opens after ``failure_threshold`` consecutive failures and rejects calls
+    for ``recovery_seconds``. It then lets ``half_open_max_calls`` trial
+    requests through: a success closes it again, a failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_seconds: float, half_open_max_calls: int):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_calls = 0
+        self.rejected = 0
+        self.transitions: Counter = Counter()
+
+    def before_call(self) -> bool:
+        """Admit a call or raise CircuitOpenError. Returns True for a half-open trial."""
+        if self.state == OPEN:
+            remaining = self.opened_at + self.recovery_seconds - time.monotonic()
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, remaining)
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self.trial_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self.recovery_seconds)
+            self.trial_calls += 1
+            return True
+        return False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        if self.state == HALF_OPEN:
+            self._transition(CLOSED)
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            if self.state != OPEN:
+                self._transition(OPEN)
+
+    def release_trial(self):
+        """Give back a half-open trial slot whose call ended without a verdict"""
+        if self.state == HALF_OPEN and self.trial_calls > 0:
+            self.trial_calls -= 1
+
+    def _transition(self, state: str):
+        logger.warning("Circuit breaker %s: %s -> %s", self.name, self.state, state)
+        self.transitions[f"{self.state}->{state}"] += 1
+        self.state = state
+        self.trial_calls = 0
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions)
+        }
+
+def create_breaker(name: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+        recovery_seconds=settings.BREAKER_RECOVERY_SECONDS,
+        half_open_max_calls=settings.BREAKER_HALF_OPEN_MAX_CALLS
+    )
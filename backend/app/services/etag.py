@@ -0,0 +1,33 @@
+# app/services/etag.py
+import hashlib
+from typing import Any, Optional
+
+import orjson
+from fastapi import Response
+
+class RenderedJSON:
+    """A JSON value serialized once, with a strong ETag over the bytes"""
+    __slots__ = ("value", "body", "etag")
+
+    def __init__(self, value: Any):
+        self.value = value
+        self.body = orjson.dumps(value)
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=16).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for it)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+def json_response(rendered: RenderedJSON, if_none_match: Optional[str], cache_control: str) -> Response:
+    """The pre-serialized body, or a bodiless 304 if the client already has it"""
+    headers = {"ETag": rendered.etag, "Cache-Control": cache_control}
+    if etag_matches(if_none_match, rendered.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=rendered.body, media_type="application/json", headers=headers)
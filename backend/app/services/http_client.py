@@ -0,0 +1,223 @@
+# app/services/http_client.py
+import asyncio
+import importlib.util
+import logging
+import time
+from typing import Dict, Optional
+
+import httpx
+from fastapi import HTTPException
+from config import Settings
+from app.services.rate_limiter import UpstreamScheduler, BACKGROUND
+from app.services.circuit_breaker import CircuitOpenError, create_breaker
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+# httpx only negotiates HTTP/2 when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+class UpstreamClient:
+    """A long-lived, pooled httpx client for a single upstream API.
+
+    Requests are first admitted by the provider's rate-limit scheduler, then
+    gated by a semaphore sized to the connection limit, so the time spent
+    waiting for a free slot can be measured and reported. 429 responses are
+    retried after Retry-After (or a jittered backoff). Transport errors and
+    5xx responses feed a circuit breaker that fails calls fast with a 503
+    while the provider is down.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        rate: float,
+        burst: float,
+        warmup_path: str = "/",
+        warmup_params: Optional[dict] = None
+    ):
+        self.name = name
+        self.base_url = base_url
+        self.scheduler = UpstreamScheduler(name, rate, burst)
+        self.breaker = create_breaker(name)
+        self.warmup_path = warmup_path
+        self.warmup_params = warmup_params or {}
+        self.max_connections = settings.UPSTREAM_MAX_CONNECTIONS
+        self.http2 = settings.UPSTREAM_HTTP2 and HTTP2_AVAILABLE
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_use = 0
+        self.waiting = 0
+        self.requests = 0
+        self.errors = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=self.http2,
+                timeout=settings.UPSTREAM_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY_SECONDS
+                ),
+                headers={"User-Agent": "Shelfd/1.0"}
+            )
+            self._slots = asyncio.Semaphore(self.max_connections)
+        return self._client
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        priority: Optional[int] = None,
+        stream: bool = False,
+        **kwargs
+    ) -> httpx.Response:
+        """Send a request; with ``stream`` the body is not read and the caller must aclose() it"""
+        try:
+            trial = self.breaker.before_call()
+        except CircuitOpenError as e:
+            raise HTTPException(
+                status_code=503,
+                detail=f"{self.name} is temporarily unavailable, please retry shortly",
+                headers={"Retry-After": str(int(e.retry_after) + 1)}
+            )
+        verdict = False
+        try:
+            attempt = 0
+            while True:
+                await self.scheduler.acquire(priority)
+                try:
+                    response = await self._send(method, url, stream, **kwargs)
+                except httpx.HTTPError:
+                    self.breaker.record_failure()
+                    verdict = True
+                    raise
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                    verdict = True
+                    return response
+                if response.status_code != 429:
+                    self.breaker.record_success()
+                    verdict = True
+                    return response
+                await response.aclose()
+                delay = self.scheduler.backoff(attempt, response.headers.get("Retry-After"))
+                self.scheduler.throttle(delay)
+                if attempt >= settings.UPSTREAM_MAX_RETRIES:
+                    raise HTTPException(
+                        status_code=503,
+                        detail=f"{self.name} rate limit exceeded, please retry shortly",
+                        headers={"Retry-After": str(int(delay) + 1)}
+                    )
+                attempt += 1
+                self.scheduler.retries += 1
+        finally:
+            if trial and not verdict:
+                # Cancelled or rate limited: neither proves nor disproves health
+                self.breaker.release_trial()
+
+    async def _send(self, method: str, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+        client = self.client
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        waited = time.monotonic() - started
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.requests += 1
+        self.in_use += 1
+        try:
+            return await client.send(client.build_request(method, url, **kwargs), stream=stream)
+        except httpx.HTTPError:
+            self.errors += 1
+            raise
+        finally:
+            self.in_use -= 1
+            self._slots.release()
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def warmup(self):
+        """Resolve DNS and open a few keep-alive connections ahead of traffic"""
+        async def _touch():
+            try:
+                await self.get(self.warmup_path, priority=BACKGROUND, params=self.warmup_params)
+            except (httpx.HTTPError, HTTPException) as e:
+                logger.warning("Upstream warmup failed for %s: %s", self.name, e)
+
+        await asyncio.gather(*(_touch() for _ in range(settings.UPSTREAM_WARMUP_CONNECTIONS)))
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        pool_size = 0
+        if self._client is not None:
+            pool = getattr(self._client._transport, "_pool", None)
+            pool_size = len(getattr(pool, "connections", []))
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "pool_size": pool_size,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_wait_ms": round(self.total_wait / self.requests * 1000, 3) if self.requests else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "scheduler": self.scheduler.stats(),
+            "breaker": self.breaker.stats()
+        }
+
+UPSTREAMS: Dict[str, UpstreamClient] = {
+    "tmdb": UpstreamClient(
+        "tmdb",
+        settings.TMDB_BASE_URL,
+        rate=settings.TMDB_RATE_LIMIT_PER_SECOND,
+        burst=settings.TMDB_RATE_LIMIT_BURST,
+        warmup_path="/configuration",
+        warmup_params={"api_key": settings.TMDB_API_KEY}
+    ),
+    "google_books": UpstreamClient(
+        "google_books",
+        settings.GOOGLE_BOOKS_BASE_URL,
+        rate=settings.GOOGLE_BOOKS_RATE_LIMIT_PER_SECOND,
+        burst=settings.GOOGLE_BOOKS_RATE_LIMIT_BURST,
+        warmup_path="/volumes",
+        warmup_params={"q": "shelfd", "maxResults": 1}
+    ),
+    # Cover art; absolute URLs to other image hosts override the base URL
+    "images": UpstreamClient(
+        "images",
+        "https://image.tmdb.org",
+        rate=settings.IMAGE_RATE_LIMIT_PER_SECOND,
+        burst=settings.IMAGE_RATE_LIMIT_BURST
+    ),
+}
+
+def get_upstream(name: str) -> UpstreamClient:
+    return UPSTREAMS[name]
+
+async def start_upstream_clients():
+    """Create the pooled clients and pre-warm their connections"""
+    await asyncio.gather(*(upstream.warmup() for upstream in UPSTREAMS.values()))
+    logger.info("Upstream clients ready (http2=%s)", HTTP2_AVAILABLE and settings.UPSTREAM_HTTP2)
+
+async def close_upstream_clients():
+    await asyncio.gather(*(upstream.close() for upstream in UPSTREAMS.values()))
+
+def upstream_stats() -> dict:
+    return {name: upstream.stats() for name, upstream in UPSTREAMS.items()}
@@ -0,0 +1,220 @@
+# app/services/image_cache.py
+import asyncio
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import orjson
+from fastapi import HTTPException
+from config import Settings
+from app.services.http_client import get_upstream
+from app.services.singleflight import SingleFlight
+
+settings = Settings()
+
+IMAGE_SIZES = ("small", "medium", "large")
+
+# TMDB serves fixed poster widths; pick one per size
+TMDB_WIDTHS = {"small": "w92", "medium": "w185", "large": "w342"}
+TMDB_PATH_RE = re.compile(r"^/t/p/[^/]+/")
+
+# Google Books thumbnails are sized by the zoom parameter
+GOOGLE_BOOKS_ZOOM = {"small": "5", "medium": "1", "large": "2"}
+GOOGLE_BOOKS_HOSTS = {"books.google.com", "books.googleusercontent.com"}
+
+ALLOWED_HOSTS = {"image.tmdb.org"} | GOOGLE_BOOKS_HOSTS
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+def normalize_image_url(url: str, size: str) -> str:
+    """Rewrite a TMDB or Google Books cover URL to the requested size
+
+    Both providers resize server-side, so normalizing the URL gives a small,
+    fixed set of variants per cover without decoding images here.
+    """
+    if size not in IMAGE_SIZES:
+        raise HTTPException(status_code=400, detail=f"Invalid size: {size}. Expected one of {list(IMAGE_SIZES)}")
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or parts.hostname not in ALLOWED_HOSTS:
+        raise HTTPException(status_code=400, detail="Image host not allowed")
+
+    path, query = parts.path, parts.query
+    if parts.hostname == "image.tmdb.org":
+        if not TMDB_PATH_RE.match(path):
+            raise HTTPException(status_code=400, detail="Invalid TMDB image path")
+        path = TMDB_PATH_RE.sub(f"/t/p/{TMDB_WIDTHS[size]}/", path)
+        query = ""
+    else:
+        params = {key: value for key, value in parse_qsl(query) if key != "edge"}
+        params["zoom"] = GOOGLE_BOOKS_ZOOM[size]
+        query = urlencode(sorted(params.items()))
+    return urlunsplit(("https", parts.hostname, path, query, ""))
+
+class ImageCache:
+    """Content-addressed on-disk cover cache with LRU eviction by total bytes.
+
+    Blobs are stored under their SHA-256, so identical images fetched via
+    different URLs share one file. A small ref file maps each normalized
+    URL to its blob and content type.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._blobs: "OrderedDict[str, int]" = OrderedDict()  # blob path -> size, oldest first
+        self._refs: Dict[str, Tuple[str, str]] = {}
+        self._flight = SingleFlight()
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    def _scan(self) -> List[Tuple[str, int]]:
+        """(path, size) of every blob on disk, least recently used first"""
+        blobs = []
+        for directory, _, files in os.walk(os.path.join(self.root, "blobs")):
+            for name in files:
+                path = os.path.join(directory, name)
+                stat = os.stat(path)
+                blobs.append((stat.st_mtime, path, stat.st_size))
+        return [(path, size) for _, path, size in sorted(blobs)]
+
+    async def _ensure_loaded(self):
+        """Rebuild the LRU order from blob access times, once
+
+        The directory walk runs in a thread; ``_blobs`` is only ever
+        changed on the event loop.
+        """
+        async with self._load_lock:
+            if self._loaded:
+                return
+            for path, size in await asyncio.to_thread(self._scan):
+                self._blobs[path] = size
+                self.bytes += size
+            self._loaded = True
+
+    async def get(self, url: str) -> Tuple[str, str, str]:
+        """Return (file path, content type, blob hash) for a normalized URL"""
+        if not self._loaded:
+            await self._ensure_loaded()
+        ref = self._refs.get(url) or await asyncio.to_thread(self._read_ref, url)
+        if ref is not None and ref[0] in self._blobs:
+            self.hits += 1
+            self._touch(ref[0])
+            return ref[0], ref[1], os.path.basename(ref[0]).split(".")[0]
+        self.misses += 1
+        return await self._flight.do(url, lambda: self._fetch(url))
+
+    async def _fetch(self, url: str) -> Tuple[str, str, str]:
+        response = await get_upstream("images").get(url, stream=True)
+        try:
+            if response.status_code == 404:
+                raise HTTPException(status_code=404, detail="Image not found")
+            if not response.is_success:
+                raise HTTPException(status_code=502, detail=f"Image host returned {response.status_code}")
+            content_type = response.headers.get("content-type", "").split(";")[0].strip()
+            if content_type not in CONTENT_TYPE_EXTENSIONS:
+                raise HTTPException(status_code=502, detail=f"Unsupported image type: {content_type}")
+            content = await _read_capped(response, settings.IMAGE_MAX_BYTES)
+        finally:
+            await response.aclose()
+
+        digest = hashlib.sha256(content).hexdigest()
+        path = os.path.join(self.root, "blobs", digest[:2], digest + CONTENT_TYPE_EXTENSIONS[content_type])
+        await asyncio.to_thread(self._write, url, path, content_type, content)
+        self._refs[url] = (path, content_type)
+        if path not in self._blobs:
+            self._blobs[path] = len(content)
+            self.bytes += len(content)
+        self._touch(path)
+        evicted = self._evict()
+        if evicted:
+            await asyncio.to_thread(_remove_files, evicted)
+        return path, content_type, digest
+
+    def _ref_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.root, "refs", key[:2], f"{key}.json")
+
+    def _read_ref(self, url: str) -> Optional[Tuple[str, str]]:
+        try:
+            with open(self._ref_path(url), "rb") as f:
+                data = orjson.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        ref = (os.path.join(self.root, data["blob"]), data["content_type"])
+        self._refs[url] = ref
+        return ref
+
+    def _write(self, url: str, path: str, content_type: str, content: bytes):
+        for target, data in (
+            (path, content),
+            (self._ref_path(url), orjson.dumps({
+                "blob": os.path.relpath(path, self.root),
+                "content_type": content_type
+            })),
+        ):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            tmp_path = f"{target}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+
+    def _touch(self, path: str):
+        self._blobs.move_to_end(path)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _evict(self) -> List[str]:
+        """Drop least recently used blobs until under budget; returns their paths to delete"""
+        evicted = []
+        while self.bytes > self.max_bytes and len(self._blobs) > 1:
+            path, size = self._blobs.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+            evicted.append(path)
+        return evicted
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "blobs": len(self._blobs),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes
+        }
+
+async def _read_capped(response: httpx.Response, max_bytes: int) -> bytes:
+    """Read a streamed body, giving up as soon as it exceeds ``max_bytes``"""
+    if int(response.headers.get("content-length") or 0) > max_bytes:
+        raise HTTPException(status_code=502, detail="Image too large")
+    chunks, size = [], 0
+    async for chunk in response.aiter_bytes():
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=502, detail="Image too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def _remove_files(paths: List[str]):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+image_cache = ImageCache(settings.IMAGE_CACHE_DIR, settings.IMAGE_CACHE_MAX_BYTES)
@@ -0,0 +1,237 @@
+# app/services/media_cache.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+import orjson
+from fastapi import HTTPException
+from config import Settings
+from app.database.models.cache import MediaCacheEntry
+from app.services.rate_limiter import request_priority, BACKGROUND
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+# Seconds an entry stays fresh, per media type
+MEDIA_TTLS = {
+    "movie": settings.MEDIA_CACHE_MOVIE_TTL_SECONDS,
+    "tv": settings.MEDIA_CACHE_TV_TTL_SECONDS,
+    "book": settings.MEDIA_CACHE_BOOK_TTL_SECONDS,
+}
+
+class CacheEntry:
+    __slots__ = ("value", "size", "fresh_until", "expires_at")
+
+    def __init__(self, value: Any, size: int, fresh_until: float, expires_at: float):
+        self.value = value
+        self.size = size
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
+
+class NotFound:
+    """Negative cache marker for an upstream 404"""
+    __slots__ = ("detail",)
+
+    def __init__(self, detail: str):
+        self.detail = detail
+
+class LRUCache:
+    """In-process LRU keyed by string, bounded by total serialized bytes.
+
+    Timestamps are wall-clock seconds so entries loaded from Mongo keep
+    their original freshness.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, value: Any, fresh_until: float, expires_at: float, size: Optional[int] = None):
+        if size is None:
+            size = len(orjson.dumps(value))
+        self.delete(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = CacheEntry(value, size, fresh_until, expires_at)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
+
+    def delete(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+class MediaCache:
+    """Two-tier metadata cache: in-process LRU in front of a Mongo collection.
+
+    Stale entries are returned immediately while a background task refreshes
+    them from the upstream. Upstream 404s are remembered in memory for
+    MEDIA_CACHE_NEGATIVE_TTL_SECONDS so unknown IDs don't hit the provider
+    on every request.
+    """
+
+    def __init__(self):
+        self.memory = LRUCache(settings.MEDIA_CACHE_MEMORY_MAX_BYTES)
+        self.stale_seconds = settings.MEDIA_CACHE_STALE_SECONDS
+        self.counters = {
+            "memory_hits": 0,
+            "mongo_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "negative_hits": 0,
+            "negative_stores": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "mongo_errors": 0,
+        }
+        self._refreshing: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()
+
+    async def get_or_fetch(
+        self,
+        media_type: str,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Cached value for ``key``, fetching it on a miss
+
+        While the upstream is down, entries are still served stale for up to
+        MEDIA_CACHE_STALE_SECONDS past their freshness.
+        """
+        key = f"{media_type}:{key}"
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.counters["memory_hits"] += 1
+        else:
+            entry = await self._load(key)
+            if entry is not None:
+                self.counters["mongo_hits"] += 1
+                self.memory.set(key, entry.value, entry.fresh_until, entry.expires_at, entry.size)
+
+        if entry is None:
+            self.counters["misses"] += 1
+            try:
+                value = await fetch()
+            except HTTPException as e:
+                if e.status_code == 404:
+                    self._store_not_found(key, str(e.detail))
+                raise
+            self._store(media_type, key, value)
+            return value
+
+        if isinstance(entry.value, NotFound):
+            self.counters["negative_hits"] += 1
+            raise HTTPException(status_code=404, detail=entry.value.detail)
+        if entry.fresh_until <= time.time():
+            self.counters["stale_hits"] += 1
+            self._refresh(media_type, key, fetch)
+        return entry.value
+
+    def _refresh(self, media_type: str, key: str, fetch: Callable[[], Awaitable[Any]]):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def _run():
+            request_priority.set(BACKGROUND)
+            try:
+                value = await fetch()
+                self._store(media_type, key, value)
+                self.counters["refreshes"] += 1
+            except Exception as e:
+                self.counters["refresh_errors"] += 1
+                logger.warning("Cache refresh failed for %s: %s", key, e)
+            finally:
+                self._refreshing.discard(key)
+
+        self._spawn(_run())
+
+    def _spawn(self, coro: Awaitable[Any]):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _load(self, key: str) -> Optional[CacheEntry]:
+        try:
+            doc = await MediaCacheEntry.find_one({"key": key})
+        except Exception as e:
+            self.counters["mongo_errors"] += 1
+            logger.warning("Cache read failed for %s: %s", key, e)
+            return None
+        if doc is None or doc.expires_at <= datetime.utcnow():
+            return None
+        return CacheEntry(
+            doc.value,
+            len(orjson.dumps(doc.value)),
+            _timestamp(doc.fresh_until),
+            _timestamp(doc.expires_at)
+        )
+
+    def _store(self, media_type: str, key: str, value: Any):
+        """Write to memory now and to Mongo in the background"""
+        now = datetime.utcnow()
+        fresh_until = now + timedelta(seconds=MEDIA_TTLS.get(media_type, settings.MEDIA_CACHE_DEFAULT_TTL_SECONDS))
+        expires_at = fresh_until + timedelta(seconds=self.stale_seconds)
+        self.memory.set(key, value, _timestamp(fresh_until), _timestamp(expires_at))
+        self._spawn(self._persist(media_type, key, value, fresh_until, expires_at))
+
+    def _store_not_found(self, key: str, detail: str):
+        """Memory only: a title added upstream shows up once the entry expires"""
+        expires_at = time.time() + settings.MEDIA_CACHE_NEGATIVE_TTL_SECONDS
+        self.memory.set(key, NotFound(detail), expires_at, expires_at, size=len(key) + len(detail))
+        self.counters["negative_stores"] += 1
+
+    async def _persist(self, media_type: str, key: str, value: Any, fresh_until: datetime, expires_at: datetime):
+        try:
+            await MediaCacheEntry.find_one({"key": key}).upsert(
+                {"$set": {"value": value, "fresh_until": fresh_until, "expires_at": expires_at}},
+                on_insert=MediaCacheEntry(
+                    key=key,
+                    media_type=media_type,
+                    value=value,
+                    fresh_until=fresh_until,
+                    expires_at=expires_at
+                )
+            )
+        except Exception as e:
+            self.counters["mongo_errors"] += 1
+            logger.warning("Cache write failed for %s: %s", key, e)
+
+    def invalidate(self, media_type: str, key: str):
+        self.memory.delete(f"{media_type}:{key}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "evictions": self.memory.evictions,
+            "entries": len(self.memory),
+            "bytes": self.memory.bytes,
+            "max_bytes": self.memory.max_bytes
+        }
+
+def _timestamp(value: datetime) -> float:
+    # Mongo hands back naive UTC datetimes
+    return (value - datetime(1970, 1, 1)).total_seconds()
+
+media_cache = MediaCache()
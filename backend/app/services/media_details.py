@@ -0,0 +1,309 @@
+# app/services/media_details.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Sequence
+
+from fastapi import HTTPException
+from config import Settings
+from app.services.http_client import get_upstream
+from app.services.media_cache import media_cache
+from app.services.catalog_service import CatalogService, DETAIL_MEDIA_TYPES, parse_year
+from app.services.singleflight import upstream_flight
+from app.services.typeahead import typeahead_index, DETAIL_VIEW_WEIGHT
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+TMDB_IMAGE_BASE_URL = "https://image.tmdb.org/t/p"
+
+# Sections TMDB can append to a movie/TV record, in request order
+TMDB_SECTIONS = ("credits", "videos", "similar", "recommendations")
+
+# Compact detail fields that need an appended section
+FIELD_SECTIONS = {
+    "cast": "credits",
+    "directors": "credits",
+    "videos": "videos",
+    "similar": "similar",
+    "recommendations": "recommendations",
+}
+
+TMDB_LABELS = {
+    "movie": "Movie",
+    "tv": "TV show",
+}
+
+COMPACT_CAST_LIMIT = 10
+COMPACT_RELATED_LIMIT = 12
+COMPACT_VIDEO_LIMIT = 5
+
+def tmdb_image(path: Optional[str], size: str) -> Optional[str]:
+    return f"{TMDB_IMAGE_BASE_URL}/{size}{path}" if path else None
+
+async def fetch_book_details(book_id: str) -> dict:
+    headers = {
+        "Accept": "application/json"
+    }
+    response = await get_upstream("google_books").get(f"/volumes/{book_id}", headers=headers)
+    
+    if response.status_code == 404:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Book with ID {book_id} not found"
+        )
+    
+    if not response.is_success:
+        logger.warning("Google Books API error for %s: %s", book_id, response.status_code)
+        raise HTTPException(
+            status_code=502 if response.status_code >= 500 else response.status_code,
+            detail=f"Google Books API error: {response.status_code}"
+        )
+    
+    data = response.json()
+    volume_info = data.get("volumeInfo", {})
+    
+    book_data = {
+        "id": data["id"],
+        "title": volume_info.get("title", "Unknown Title"),
+        "author": ", ".join(volume_info.get("authors", ["Unknown Author"])),
+        "description": volume_info.get("description", "No description available"),
+        "rating": volume_info.get("averageRating"),
+        "tags": volume_info.get("categories", []),
+        "image_url": volume_info.get("imageLinks", {}).get("thumbnail"),
+        "publishedDate": volume_info.get("publishedDate"),
+        "pageCount": volume_info.get("pageCount"),
+        "language": volume_info.get("language"),
+        "previewLink": volume_info.get("previewLink")
+    }
+    return book_data
+
+async def fetch_tmdb_details(kind: str, tmdb_id: int, sections: Iterable[str] = TMDB_SECTIONS) -> dict:
+    """Fetch a TMDB movie or TV record with the requested appended sections"""
+    url = f"/{kind}/{tmdb_id}"
+    params = {"api_key": settings.TMDB_API_KEY}
+    if sections:
+        params["append_to_response"] = ",".join(sections)
+    
+    response = await get_upstream("tmdb").get(url, params=params)
+    
+    if response.status_code == 404:
+        raise HTTPException(
+            status_code=404,
+            detail=f"{TMDB_LABELS[kind]} with ID {tmdb_id} not found"
+        )
+    
+    response.raise_for_status()
+    return response.json()
+
+def _index_tmdb_details(kind: str, data: dict):
+    date = data.get("release_date") or data.get("first_air_date")
+    typeahead_index.add(
+        {
+            "id": str(data.get("id", "")),
+            "title": data.get("title") or data.get("name"),
+            "subtitle": date[:4] if date else None,
+            "image_url": tmdb_image(data.get("poster_path"), "w92"),
+            "type": kind
+        },
+        weight=DETAIL_VIEW_WEIGHT
+    )
+
+def _year(date: Optional[str]) -> Optional[str]:
+    return date[:4] if date else None
+
+def _card(item: dict) -> dict:
+    return {
+        "id": str(item["id"]),
+        "title": item.get("title") or item.get("name"),
+        "year": _year(item.get("release_date") or item.get("first_air_date")),
+        "poster_url": tmdb_image(item.get("poster_path"), "w185")
+    }
+
+def normalize_tmdb_details(kind: str, data: dict, sections: Sequence[str]) -> dict:
+    """Reduce a raw TMDB record to the compact detail shape the UI renders"""
+    date = data.get("release_date") or data.get("first_air_date")
+    detail = {
+        "id": str(data["id"]),
+        "type": kind,
+        "title": data.get("title") or data.get("name"),
+        "tagline": data.get("tagline") or None,
+        "overview": data.get("overview"),
+        "year": _year(date),
+        "release_date": date,
+        "status": data.get("status"),
+        "genres": [genre["name"] for genre in data.get("genres", [])],
+        "rating": data.get("vote_average"),
+        "vote_count": data.get("vote_count"),
+        "poster_url": tmdb_image(data.get("poster_path"), "w342"),
+        "backdrop_url": tmdb_image(data.get("backdrop_path"), "w780"),
+    }
+    if kind == "movie":
+        detail["runtime"] = data.get("runtime")
+    else:
+        detail["creators"] = [creator["name"] for creator in data.get("created_by", [])]
+        detail["number_of_seasons"] = data.get("number_of_seasons")
+        detail["number_of_episodes"] = data.get("number_of_episodes")
+        runtimes = data.get("episode_run_time") or []
+        detail["runtime"] = runtimes[0] if runtimes else None
+
+    if "credits" in sections:
+        credits = data.get("credits", {})
+        detail["cast"] = [
+            {
+                "id": member["id"],
+                "name": member.get("name"),
+                "character": member.get("character"),
+                "profile_url": tmdb_image(member.get("profile_path"), "w185")
+            }
+            for member in sorted(credits.get("cast", []), key=lambda member: member.get("order", 0))[:COMPACT_CAST_LIMIT]
+        ]
+        detail["directors"] = [
+            member.get("name") for member in credits.get("crew", []) if member.get("job") == "Director"
+        ]
+    if "videos" in sections:
+        detail["videos"] = [
+            {
+                "key": video.get("key"),
+                "name": video.get("name"),
+                "site": video.get("site"),
+                "type": video.get("type")
+            }
+            for video in data.get("videos", {}).get("results", [])
+            if video.get("site") == "YouTube"
+        ][:COMPACT_VIDEO_LIMIT]
+    for section in ("similar", "recommendations"):
+        if section in sections:
+            detail[section] = [
+                _card(item) for item in data.get(section, {}).get("results", [])[:COMPACT_RELATED_LIMIT]
+            ]
+    return detail
+
+def parse_projection(include: Optional[str], fields: Optional[str]) -> Optional[tuple]:
+    """Turn include=/fields= query values into (sections, fields)
+
+    Returns None when neither is given, meaning the raw TMDB record.
+    """
+    if include is None and fields is None:
+        return None
+    field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else []
+    if include is not None:
+        sections = {section.strip() for section in include.split(",") if section.strip()}
+    else:
+        sections = {FIELD_SECTIONS[field] for field in field_list if field in FIELD_SECTIONS}
+    unknown = sections - set(TMDB_SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid include: {sorted(unknown)}. Expected any of {list(TMDB_SECTIONS)}"
+        )
+    return tuple(section for section in TMDB_SECTIONS if section in sections), field_list
+
+async def _limited(fetch: Callable[[], Awaitable[Any]], limit: Optional[asyncio.Semaphore]) -> Any:
+    """Run an upstream fetch, holding a slot of ``limit`` when one is given"""
+    if limit is None:
+        return await fetch()
+    async with limit:
+        return await fetch()
+
+async def _save_to_catalog(kind: str, media_id: str, summary: dict):
+    try:
+        await CatalogService.upsert(DETAIL_MEDIA_TYPES[kind], media_id, **summary)
+    except Exception as e:
+        logger.warning("Catalog write failed for %s:%s: %s", kind, media_id, e)
+
+def _tmdb_summary(kind: str, data: dict) -> dict:
+    if kind == "movie":
+        creators = [
+            member.get("name") for member in data.get("credits", {}).get("crew", [])
+            if member.get("job") == "Director"
+        ]
+    else:
+        creators = [creator.get("name") for creator in data.get("created_by", [])]
+    return {
+        "title": data.get("title") or data.get("name") or "Unknown Title",
+        "creator": ", ".join(creators) or None,
+        "image_url": tmdb_image(data.get("poster_path"), "w185"),
+        "year": parse_year(data.get("release_date") or data.get("first_air_date"))
+    }
+
+async def _load_book_details(book_id: str) -> dict:
+    """Upstream details, with the catalog summary refreshed from them"""
+    book_data = await fetch_book_details(book_id)
+    await _save_to_catalog("book", book_id, {
+        "title": book_data["title"],
+        "creator": book_data["author"],
+        "image_url": book_data["image_url"],
+        "year": parse_year(book_data["publishedDate"])
+    })
+    return book_data
+
+async def _load_tmdb_details(kind: str, tmdb_id: int) -> dict:
+    """Upstream details, with the catalog summary refreshed from them"""
+    data = await fetch_tmdb_details(kind, tmdb_id)
+    await _save_to_catalog(kind, str(tmdb_id), _tmdb_summary(kind, data))
+    return data
+
+async def get_book_details(book_id: str, limit: Optional[asyncio.Semaphore] = None) -> dict:
+    """Book details through the cache and the shared in-flight fetch
+
+    ``limit`` bounds concurrent upstream fetches; cache hits never wait on it.
+    """
+    book_data = await media_cache.get_or_fetch(
+        "book", book_id,
+        lambda: _limited(
+            lambda: upstream_flight.do(f"book:{book_id}", lambda: _load_book_details(book_id)), limit
+        )
+    )
+    typeahead_index.add(
+        {
+            "id": book_data["id"],
+            "title": book_data["title"],
+            "subtitle": book_data["author"],
+            "image_url": book_data["image_url"],
+            "type": "book"
+        },
+        creator=book_data["author"],
+        weight=DETAIL_VIEW_WEIGHT
+    )
+    return book_data
+
+async def get_tmdb_details(
+    kind: str,
+    tmdb_id: int,
+    sections: Optional[Sequence[str]] = None,
+    fields: Optional[List[str]] = None,
+    limit: Optional[asyncio.Semaphore] = None
+) -> dict:
+    """Movie/TV details through the cache and the shared in-flight fetch
+
+    Without ``sections`` the raw TMDB record (all sections appended) is
+    returned. Otherwise only those sections are requested upstream, and the
+    compact normalized record is cached and returned, optionally narrowed
+    to ``fields``. ``limit`` bounds concurrent upstream fetches.
+    """
+    if sections is None:
+        data = await media_cache.get_or_fetch(
+            kind, str(tmdb_id),
+            lambda: _limited(
+                lambda: upstream_flight.do(f"{kind}:{tmdb_id}", lambda: _load_tmdb_details(kind, tmdb_id)), limit
+            )
+        )
+        _index_tmdb_details(kind, data)
+        return data
+
+    variant = ",".join(sections) or "base"
+    key = f"{tmdb_id}:compact:{variant}"
+
+    async def _fetch_compact() -> dict:
+        raw = await fetch_tmdb_details(kind, tmdb_id, sections)
+        _index_tmdb_details(kind, raw)
+        await _save_to_catalog(kind, str(tmdb_id), _tmdb_summary(kind, raw))
+        return normalize_tmdb_details(kind, raw, sections)
+
+    detail = await media_cache.get_or_fetch(
+        kind, key,
+        lambda: _limited(lambda: upstream_flight.do(f"{kind}:{key}", _fetch_compact), limit)
+    )
+    if fields:
+        return {field: detail[field] for field in fields if field in detail}
+    return detail
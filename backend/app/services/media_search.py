@@ -0,0 +1,141 @@
+# app/services/media_search.py
+import asyncio
+import logging
+from typing import AsyncIterator, List, Tuple
+
+from config import Settings
+from app.services.http_client import get_upstream
+from app.services.singleflight import upstream_flight
+from app.services.typeahead import typeahead_index
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+async def _search_movies(query: str) -> List[dict]:
+    response = await get_upstream("tmdb").get(
+        "/search/movie",
+        params={
+            "api_key": settings.TMDB_API_KEY,
+            "query": query,
+            "language": "en-US",
+            "page": 1
+        }
+    )
+    movie_data = response.json()
+    return [
+        {
+            "id": str(item["id"]),
+            "title": item["title"],
+            "subtitle": item.get("release_date", "")[:4] if item.get("release_date") else None,
+            "image_url": f"https://image.tmdb.org/t/p/w92{item['poster_path']}" if item.get("poster_path") else None,
+            "type": "movie"
+        }
+        for item in movie_data.get("results", [])[:5]
+    ]
+
+async def _search_tv_shows(query: str) -> List[dict]:
+    response = await get_upstream("tmdb").get(
+        "/search/tv",
+        params={
+            "api_key": settings.TMDB_API_KEY,
+            "query": query,
+            "language": "en-US",
+            "page": 1
+        }
+    )
+    tv_data = response.json()
+    return [
+        {
+            "id": str(item["id"]),
+            "title": item["name"],
+            "subtitle": item.get("first_air_date", "")[:4] if item.get("first_air_date") else None,
+            "image_url": f"https://image.tmdb.org/t/p/w92{item['poster_path']}" if item.get("poster_path") else None,
+            "type": "tv"
+        }
+        for item in tv_data.get("results", [])[:5]
+    ]
+
+async def _search_books(query: str) -> List[dict]:
+    response = await get_upstream("google_books").get(
+        "/volumes",
+        params={
+            "q": query,
+            "maxResults": 5
+        }
+    )
+    book_data = response.json()
+    return [
+        {
+            "id": item.get("id", ""),
+            "title": item.get("volumeInfo", {}).get("title", "Unknown Title"),
+            "subtitle": item.get("volumeInfo", {}).get("authors", [""])[0] if item.get("volumeInfo", {}).get("authors") else None,
+            "image_url": item.get("volumeInfo", {}).get("imageLinks", {}).get("thumbnail"),
+            "type": "book"
+        }
+        for item in book_data.get("items", [])[:5]
+    ]
+
+# Result group -> (provider search, per-provider timeout in seconds)
+SEARCH_PROVIDERS = {
+    "movies": (_search_movies, settings.TMDB_SEARCH_TIMEOUT_SECONDS),
+    "tv_shows": (_search_tv_shows, settings.TMDB_SEARCH_TIMEOUT_SECONDS),
+    "books": (_search_books, settings.GOOGLE_BOOKS_SEARCH_TIMEOUT_SECONDS),
+}
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form used as the upstream request key"""
+    return " ".join(query.lower().split())
+
+async def _run_provider(group: str, query: str) -> Tuple[str, List[dict], str]:
+    """Run one provider search under its own timeout, never raising"""
+    search, timeout = SEARCH_PROVIDERS[group]
+    try:
+        results = await asyncio.wait_for(
+            upstream_flight.do(f"search:{group}:{query}", lambda: search(query)),
+            timeout=timeout
+        )
+        typeahead_index.add_results(results)
+        return group, results, "ok"
+    except asyncio.TimeoutError:
+        logger.info("Search timeout: %s exceeded %ss", group, timeout)
+        return group, [], "timeout"
+    except Exception as e:
+        logger.warning("Search error (%s): %s", group, e)
+        return group, [], "error"
+
+async def iter_search_groups(query: str) -> AsyncIterator[Tuple[str, List[dict], str]]:
+    """Yield (group, results, status) for each group as soon as it is ready
+
+    Groups the local typeahead index can fill are yielded first, straight
+    from memory. The remaining providers are queried concurrently; groups
+    that miss their own timeout or the overall deadline are yielded empty
+    with a "timeout" status.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.SEARCH_DEADLINE_SECONDS
+
+    local = typeahead_index.search(query)
+    pending = {}
+    for group in SEARCH_PROVIDERS:
+        if len(local[group]) >= settings.TYPEAHEAD_MIN_RESULTS:
+            yield group, local[group], "ok"
+        else:
+            pending[asyncio.create_task(_run_provider(group, query))] = group
+
+    try:
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, _ = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                del pending[task]
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    for group in pending.values():
+        yield group, [], "timeout"
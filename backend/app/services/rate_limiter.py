@@ -0,0 +1,140 @@
+# app/services/rate_limiter.py
+import asyncio
+import contextvars
+import heapq
+import itertools
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple
+
+from config import Settings
+
+settings = Settings()
+
+# Lower value is served first
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Priority of upstream calls made from the current task. Background jobs
+# (cache refreshes, warming, imports) set this to BACKGROUND.
+request_priority: contextvars.ContextVar[int] = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """Take a token and return 0, or return the seconds until one is available"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class UpstreamScheduler:
+    """Admits requests to one upstream at its configured rate.
+
+    Callers that cannot be admitted immediately wait in a priority queue, so
+    interactive requests overtake queued background work. A 429 pauses the
+    whole queue until the upstream's Retry-After has passed.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.throttled_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._pump_task: Optional[asyncio.Task] = None
+        self.queued = {priority: 0 for priority in PRIORITY_NAMES}
+        self.admitted = 0
+        self.delayed = 0
+        self.throttle_events = 0
+        self.retries = 0
+
+    async def acquire(self, priority: Optional[int] = None):
+        if priority is None:
+            priority = request_priority.get()
+        if not self._waiters and self._admit_now():
+            self.admitted += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self.queued[priority] += 1
+        self.delayed += 1
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        try:
+            await future
+            self.admitted += 1
+        finally:
+            self.queued[priority] -= 1
+
+    def _admit_now(self) -> bool:
+        now = time.monotonic()
+        if now < self.throttled_until:
+            return False
+        return self.bucket.take(now) == 0.0
+
+    async def _pump(self):
+        while self._waiters:
+            _, _, future = self._waiters[0]
+            if future.done():
+                # The waiter was cancelled
+                heapq.heappop(self._waiters)
+                continue
+            now = time.monotonic()
+            if now < self.throttled_until:
+                await asyncio.sleep(self.throttled_until - now)
+                continue
+            wait = self.bucket.take(now)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            heapq.heappop(self._waiters)
+            future.set_result(None)
+
+    def throttle(self, delay: float):
+        """Hold back every request for ``delay`` seconds after a 429"""
+        self.throttle_events += 1
+        self.throttled_until = max(self.throttled_until, time.monotonic() + delay)
+
+    def backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Delay before retrying: Retry-After when given, else exponential, plus jitter"""
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = min(
+                settings.UPSTREAM_BACKOFF_MAX_SECONDS,
+                settings.UPSTREAM_BACKOFF_BASE_SECONDS * (2 ** attempt)
+            )
+        return delay + random.uniform(0, settings.UPSTREAM_BACKOFF_BASE_SECONDS)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": {PRIORITY_NAMES[p]: count for p, count in self.queued.items()},
+            "admitted": self.admitted,
+            "delayed": self.delayed,
+            "throttle_events": self.throttle_events,
+            "retries": self.retries,
+            "throttled_for_s": round(max(0.0, self.throttled_until - time.monotonic()), 3)
+        }
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,143 @@
+# app/services/shelf_cache.py
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import Settings
+from app.services.etag import RenderedJSON
+from app.services.media_cache import LRUCache
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+# (user_id, media_type, version)
+InvalidationHandler = Callable[[str, str, int], Awaitable[None]]
+
+class InvalidationChannel(ABC):
+    """Broadcasts shelf version bumps between workers.
+
+    A channel delivers every published message to every started cache,
+    including the publisher's own, so implementations may simply fan out.
+    Delivery is best effort; cached views also expire after
+    SHELF_CACHE_TTL_SECONDS in case a message is lost.
+    """
+
+    @abstractmethod
+    async def start(self, handler: InvalidationHandler):
+        """Deliver every message published from now on to ``handler``"""
+
+    @abstractmethod
+    async def publish(self, user_id: str, media_type: str, version: int):
+        """Send a version bump to every started cache"""
+
+    async def close(self):
+        pass
+
+class LocalInvalidationChannel(InvalidationChannel):
+    """In-process channel: coherent for caches in the same process only.
+
+    This is the only channel there is, so the shelf cache is only correct
+    with a single worker (as deployed: one uvicorn process). Running more
+    needs a cross-process channel here, e.g. on a MongoDB change stream;
+    until then other workers serve views up to SHELF_CACHE_TTL_SECONDS old.
+    """
+
+    def __init__(self):
+        self._handlers: List[InvalidationHandler] = []
+
+    async def start(self, handler: InvalidationHandler):
+        self._handlers.append(handler)
+
+    async def publish(self, user_id: str, media_type: str, version: int):
+        for handler in list(self._handlers):
+            await handler(user_id, media_type, version)
+
+    async def close(self):
+        self._handlers.clear()
+
+class ShelfCache:
+    """Per-user shelf listings cached in process, invalidated by version.
+
+    Each (user_id, media_type) has one LRU entry holding a version and the
+    views (full listing, summaries) read at that version. Every shelf write
+    bumps the version, leaving an empty entry behind; a read that raced a
+    write finds a newer version when it finishes and is not cached.
+    Versions and views share one byte-bounded LRU, so memory stays bounded
+    however many users there are. Versions come from the wall clock (kept
+    strictly increasing) so bumps from different workers order sensibly.
+    """
+
+    def __init__(self, channel: Optional[InvalidationChannel] = None):
+        self.channel = channel or LocalInvalidationChannel()
+        self.memory = LRUCache(settings.SHELF_CACHE_MAX_BYTES)
+        self.ttl = settings.SHELF_CACHE_TTL_SECONDS
+        self.counters = {"hits": 0, "misses": 0, "invalidations": 0, "remote_invalidations": 0}
+
+    async def start(self):
+        await self.channel.start(self._on_invalidate)
+
+    async def close(self):
+        await self.channel.close()
+
+    def _entry(self, user_id: str, media_type: str) -> Tuple[int, Dict[str, RenderedJSON]]:
+        entry = self.memory.get(f"{user_id}:{media_type}")
+        return entry.value if entry is not None else (0, {})
+
+    def _set(self, user_id: str, media_type: str, version: int, views: Dict[str, RenderedJSON]):
+        expires_at = time.time() + self.ttl
+        size = 64 + sum(len(view.body) for view in views.values())
+        self.memory.set(f"{user_id}:{media_type}", (version, views), expires_at, expires_at, size)
+
+    def version(self, user_id: str, media_type: str) -> int:
+        return self._entry(user_id, media_type)[0]
+
+    async def get_or_load(
+        self,
+        user_id: str,
+        media_type: str,
+        view: str,
+        load: Callable[[], Awaitable[Any]]
+    ) -> RenderedJSON:
+        """Cached ``view`` of a user's shelves, loading it if missing or outdated
+
+        Views are kept serialized, with their ETag, so a hit costs neither a
+        query nor a re-serialization.
+        """
+        version, views = self._entry(user_id, media_type)
+        if view in views:
+            self.counters["hits"] += 1
+            return views[view]
+
+        self.counters["misses"] += 1
+        value = RenderedJSON(await load())
+        current, views = self._entry(user_id, media_type)
+        if current == version:
+            self._set(user_id, media_type, version, {**views, view: value})
+        return value
+
+    async def invalidate(self, user_id: str, media_type: str):
+        """Bump the version after a write and tell the other workers"""
+        version = max(self.version(user_id, media_type) + 1, time.time_ns())
+        self._set(user_id, media_type, version, {})
+        self.counters["invalidations"] += 1
+        try:
+            await self.channel.publish(user_id, media_type, version)
+        except Exception as e:
+            logger.warning("Shelf invalidation publish failed for %s/%s: %s", user_id, media_type, e)
+
+    async def _on_invalidate(self, user_id: str, media_type: str, version: int):
+        if version > self.version(user_id, media_type):
+            self._set(user_id, media_type, version, {})
+            self.counters["remote_invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "entries": len(self.memory),
+            "evictions": self.memory.evictions,
+            "bytes": self.memory.bytes,
+            "max_bytes": self.memory.max_bytes
+        }
+
+shelf_cache = ShelfCache()
@@ -1,7 +1,244 @@
-from ..database.models.shelf import ShelfModel, ShelfItemModel, MediaType, ShelfType
-from ..database.schemas.shelf import MediaType, ShelfType, ShelfStatus
+from ..database.models.shelf import ShelfModel, ShelfItemModel, MediaItem, MediaType, ShelfType
+from ..database.schemas.shelf import MediaType, ShelfType, ShelfStatus, ShelfOperation
+from ..database.indexes import index_builder
+from .typeahead import typeahead_index
+from .catalog_service import CatalogService
+from .etag import RenderedJSON
+from .shelf_cache import shelf_cache
+from beanie import PydanticObjectId
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import DeleteMany, InsertOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from config import Settings
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import base64
+import binascii
+import functools
+import inspect
+import logging
+import orjson
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+# Default shelves exist virtually until first written to
+VIRTUAL_SHELF_PREFIX = "default:"
+
+# Shelf item page sort orders; text sorts compare case-insensitively
+SHELF_ITEM_SORTS = ("added_at", "title", "creator")
+TEXT_COLLATION = {"locale": "en", "strength": 2}
+
+def _catalog_field(field: str, fallback: str) -> dict:
+    return {"$ifNull": [{"$arrayElemAt": [f"$catalog.{field}", 0]}, fallback]}
+
+def _item_display_stages(media_type: MediaType) -> List[dict]:
+    """Stages that shape shelf items for display, preferring catalog metadata
+
+    Item title/creator/cover come from the media catalog when it has an
+    entry, falling back to the values stored on the shelf item.
+    """
+    return [
+        {"$lookup": {
+            "from": MediaItem.Settings.name,
+            "localField": "media_id",
+            "foreignField": "media_id",
+            "pipeline": [
+                {"$match": {"media_type": media_type.value}},
+                {"$project": {"_id": 0, "title": 1, "creator": 1, "image_url": 1}}
+            ],
+            "as": "catalog"
+        }},
+        {"$project": {
+            "_id": 0,
+            "media_id": 1,
+            "title": _catalog_field("title", "$title"),
+            "creator": _catalog_field("creator", "$creator"),
+            "cover_image": _catalog_field("image_url", "$cover_image"),
+            "added_at": 1
+        }}
+    ]
+
+def shelf_listing_pipeline(user_id: str, media_type: MediaType) -> List[dict]:
+    """Aggregation over shelves that embeds each shelf's items, newest last"""
+    media_type = MediaType(media_type)
+    return [
+        {"$match": {"user_id": user_id, "media_type": media_type.value}},
+        {"$sort": {"_id": 1}},
+        {"$set": {"_id": {"$toString": "$_id"}}},
+        {"$lookup": {
+            "from": ShelfItemModel.Settings.name,
+            "localField": "_id",
+            "foreignField": "shelf_id",
+            "pipeline": [
+                {"$match": {"user_id": user_id}},
+                {"$sort": {"added_at": 1}},
+                *_item_display_stages(media_type)
+            ],
+            "as": "items"
+        }},
+    ]
+
+def shelf_summary_pipeline(user_id: str, media_type: MediaType, cover_count: int) -> List[dict]:
+    """Aggregation over shelves with each shelf's item count and newest few items
+
+    Shelf items are only counted, except for the ``cover_count`` most
+    recently added. Shelves not yet migrated by 0001_shelf_membership
+    still carry the legacy embedded ``items`` array, so it is dropped.
+    """
+    media_type = MediaType(media_type)
+    return [
+        {"$match": {"user_id": user_id, "media_type": media_type.value}},
+        {"$project": {"items": 0}},
+        {"$sort": {"_id": 1}},
+        {"$set": {"_id": {"$toString": "$_id"}}},
+        {"$lookup": {
+            "from": ShelfItemModel.Settings.name,
+            "localField": "_id",
+            "foreignField": "shelf_id",
+            "pipeline": [{"$match": {"user_id": user_id}}, {"$count": "n"}],
+            "as": "item_count"
+        }},
+        {"$lookup": {
+            "from": ShelfItemModel.Settings.name,
+            "localField": "_id",
+            "foreignField": "shelf_id",
+            "pipeline": [
+                {"$match": {"user_id": user_id}},
+                {"$sort": {"added_at": -1, "_id": -1}},
+                {"$limit": cover_count},
+                *_item_display_stages(media_type)
+            ],
+            "as": "recent_items"
+        }},
+        {"$set": {"item_count": {"$ifNull": [{"$arrayElemAt": ["$item_count.n", 0]}, 0]}}},
+    ]
+
+def _keyset_filter(field: str, value, last_id: PydanticObjectId, descending: bool) -> dict:
+    """Match items strictly after (value, last_id) in (field, _id) sort order
+
+    Missing/null values sort before everything ascending and after
+    everything descending, and comparison operators never match null, so
+    they need their own branches.
+    """
+    op = "$lt" if descending else "$gt"
+    tie = {field: value, "_id": {op: last_id}}
+    if value is None:
+        return tie if descending else {"$or": [tie, {field: {"$ne": None}}]}
+    after = [{field: {op: value}}, tie]
+    if descending:
+        after.append({field: None})
+    return {"$or": after}
+
+def shelf_item_page_query(
+    user_id: str,
+    shelf_id: str,
+    sort: str,
+    descending: bool,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], dict]:
+    """Aggregation (and its options) reading one page of shelf items, ``limit + 1`` long
+
+    Text sorts need TEXT_COLLATION to use their indexes. It applies to the
+    whole aggregation, so the catalog overlay is left to a separate query
+    rather than a $lookup, whose string matches would then miss the
+    catalog's simple-collation index.
+    """
+    if sort not in SHELF_ITEM_SORTS:
+        raise ValueError(f"Invalid sort: {sort}. Expected one of {list(SHELF_ITEM_SORTS)}")
+    match = {"user_id": user_id, "shelf_id": shelf_id}
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort)
+        match.update(_keyset_filter(sort, value, last_id, descending))
+    direction = -1 if descending else 1
+    pipeline = [
+        {"$match": match},
+        {"$sort": {sort: direction, "_id": direction}},
+        {"$limit": limit + 1},
+        {"$project": {"media_id": 1, "media_type": 1, "title": 1, "creator": 1, "cover_image": 1, "added_at": 1}},
+    ]
+    return pipeline, ({"collation": TEXT_COLLATION} if sort != "added_at" else {})
+
+def encode_cursor(value, last_id) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps([value, str(last_id)])).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[object, PydanticObjectId]:
+    """Inverse of encode_cursor; raises ValueError for anything malformed"""
+    try:
+        value, last_id = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if sort == "added_at" and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, PydanticObjectId(last_id)
+    except (ValueError, TypeError, InvalidId, binascii.Error):
+        raise ValueError("Invalid cursor")
+
+def virtual_shelf_id(media_type: MediaType, status: ShelfStatus) -> str:
+    return f"{VIRTUAL_SHELF_PREFIX}{media_type.value}:{status.value}"
+
+def parse_virtual_shelf_id(shelf_id: str) -> Optional[Tuple[MediaType, ShelfStatus]]:
+    """(media_type, status) of a virtual default shelf id, or None for any other id"""
+    if not shelf_id.startswith(VIRTUAL_SHELF_PREFIX):
+        return None
+    try:
+        media_type, status = shelf_id[len(VIRTUAL_SHELF_PREFIX):].split(":")
+        return MediaType(media_type), ShelfStatus(status)
+    except ValueError:
+        return None
+
+def _shelf_document(user_id: str, name: str, media_type: MediaType, status: ShelfStatus, shelf_type: ShelfType) -> dict:
+    now = datetime.utcnow()
+    return {
+        "user_id": user_id,
+        "name": name,
+        "media_type": media_type.value,
+        "shelf_type": shelf_type.value,
+        "status": status.value,
+        "is_default": shelf_type == ShelfType.DEFAULT,
+        "description": None,
+        "is_private": False,
+        "has_collaborators": False,
+        "created_at": now,
+        "updated_at": now
+    }
+
+def _supports_transactions(client) -> bool:
+    """Multi-document transactions need a replica set or sharded cluster"""
+    topology = client.delegate.topology_description.topology_type_name
+    return topology in ("ReplicaSetWithPrimary", "Sharded", "LoadBalanced")
+
+def _invalidates_shelf_cache(media_type_arg: str):
+    """Bump the cached shelf views of the media type(s) a write touched
+
+    ``media_type_arg`` names the argument holding the media type, or the
+    list of operations for bulk writes; None there means every media type.
+    Runs whether or not the write succeeded, since a failure may come
+    after part of it was applied. The media types are resolved before the
+    write, so a bad one raises before anything is written rather than
+    masking the write's own error.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs).arguments
+            value = arguments.get(media_type_arg)
+            if value is None:
+                media_types = set(MediaType)
+            elif isinstance(value, list):
+                media_types = {MediaType(operation.media_type) for operation in value}
+            else:
+                media_types = {MediaType(value)}
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                for media_type in media_types:
+                    await shelf_cache.invalidate(arguments["user_id"], media_type.value)
+        return wrapper
+    return decorator
 
 class ShelfService:
     DEFAULT_SHELVES = {
@@ -30,36 +267,79 @@ class ShelfService:
     }
 
     @staticmethod
-    async def create_default_shelves(user_id: str, media_type: MediaType) -> List[ShelfModel]:
-        default_shelves = []
-        
-        if media_type == MediaType.ARTICLE:
-            statuses = ["saved", "finished"]
-            names = ["Saved", "Finished"]
-        else:
-            action = "Read" if media_type == MediaType.BOOK else "Watch"
-            statuses = ["want_to", "current", "finished", "did_not_finish"]
-            names = [
-                f"Want to {action}",
-                f"Currently {action}ing",
-                "Finished",
-                "Did not Finish"
-            ]
-        
-        for status, name in zip(statuses, names):
-            shelf = ShelfModel(
+    def default_shelf_name(media_type: MediaType, status: ShelfStatus) -> Optional[str]:
+        for name, default_status in ShelfService.DEFAULT_SHELVES.get(media_type, []):
+            if default_status == status:
+                return name
+        return None
+
+    @staticmethod
+    def virtual_shelves(user_id: str, media_type: MediaType) -> List[dict]:
+        """Listing entries for default shelves that have no document yet"""
+        return [
+            {
+                **_shelf_document(user_id, name, media_type, status, ShelfType.DEFAULT),
+                "_id": virtual_shelf_id(media_type, status),
+                "items": [],
+                "created_at": None,
+                "updated_at": None,
+                "virtual": True
+            }
+            for name, status in ShelfService.DEFAULT_SHELVES[media_type]
+        ]
+
+    @staticmethod
+    @_invalidates_shelf_cache("media_type")
+    async def create_default_shelves(user_id: str, media_type: Optional[MediaType] = None) -> List[ShelfModel]:
+        """Materialize the missing default shelves (of one or all media types) with one insert_many
+
+        Default shelves are normally virtual until first written to; this
+        is for callers that need real documents up front. The shelves are
+        read back after the insert, so they carry their ids even where a
+        concurrent request materialized them first.
+        """
+        media_types = [media_type] if media_type else list(ShelfService.DEFAULT_SHELVES)
+        existing = {
+            (shelf["media_type"], shelf["status"])
+            async for shelf in ShelfModel.get_motor_collection().find(
+                {
+                    "user_id": user_id,
+                    "media_type": {"$in": [m.value for m in media_types]},
+                    "shelf_type": ShelfType.DEFAULT.value
+                },
+                {"media_type": 1, "status": 1}
+            )
+        }
+        default_shelves = [
+            ShelfModel(
                 user_id=user_id,
                 name=name,
                 media_type=media_type,
                 status=status,
-                shelf_type=ShelfType.DEFAULT
+                shelf_type=ShelfType.DEFAULT,
+                is_default=True
             )
-            await shelf.save()
-            default_shelves.append(shelf)
-        
-        return default_shelves
+            for media_type in media_types
+            for name, status in ShelfService.DEFAULT_SHELVES[media_type]
+            if (media_type.value, status.value) not in existing
+        ]
+        if not default_shelves:
+            return []
+        try:
+            await ShelfModel.insert_many(default_shelves, ordered=False)
+        except BulkWriteError as e:
+            # Shelves materialized concurrently are fine; anything else is not
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+        # insert_many does not write ids back to the models
+        return await ShelfModel.find({
+            "user_id": user_id,
+            "shelf_type": ShelfType.DEFAULT.value,
+            "$or": [{"media_type": shelf.media_type.value, "status": shelf.status.value} for shelf in default_shelves]
+        }).to_list()
 
     @staticmethod
+    @_invalidates_shelf_cache("media_type")
     async def create_custom_shelf(
         user_id: str,
         name: str,
@@ -77,12 +357,12 @@ class ShelfService:
             status=ShelfStatus.WANT_TO,
             description=description,
             is_private=is_private,
-            has_collaborators=has_collaborators,
-            items=[]
+            has_collaborators=has_collaborators
         )
         return await shelf.insert()
 
     @staticmethod
+    @_invalidates_shelf_cache("media_type")
     async def add_to_shelf(
         user_id: str,
         shelf_id: str,
@@ -92,187 +372,477 @@ class ShelfService:
         creator: Optional[str] = None,
         cover_image: Optional[str] = None
     ) -> ShelfItemModel:
-        """Add an item to a shelf"""
-        # Get the shelf and verify ownership
-        shelf = await ShelfModel.get(shelf_id)
-        if not shelf or shelf.user_id != user_id:
+        """Add an item to a shelf
+
+        The ownership check is the filter of the shelf's updated_at bump and
+        the unique (user_id, shelf_id, media_id) index rejects a duplicate
+        insert, so nothing is read first unless that index is not confirmed
+        built (e.g. its build failed on existing duplicates).
+        """
+        shelf_id = await ShelfService.resolve_shelf_id(user_id, shelf_id)
+        try:
+            shelf_object_id = PydanticObjectId(shelf_id)
+        except InvalidId:
             raise ValueError("Invalid shelf")
         
-        # Check if the item is already in the shelf
-        if media_id in shelf.items:
+        result = await ShelfModel.get_motor_collection().update_one(
+            {"_id": shelf_object_id, "user_id": user_id},
+            {"$set": {"updated_at": datetime.utcnow()}}
+        )
+        if result.matched_count == 0:
+            raise ValueError("Invalid shelf")
+        if not index_builder.is_built(ShelfItemModel) and await ShelfItemModel.get_motor_collection().find_one(
+            {"user_id": user_id, "shelf_id": shelf_id, "media_id": media_id}, {"_id": 1}
+        ):
             raise ValueError("Item already in shelf")
         
-        # Add media_id to shelf's items list
-        shelf.items.append(media_id)
-        await shelf.save()
-        
-        # Create shelf item
         shelf_item = ShelfItemModel(
             user_id=user_id,
             shelf_id=str(shelf_id),  # Convert ObjectId to string
             media_id=media_id,
             media_type=media_type,
             title=title,
-            creator=creator,
-            cover_image=cover_image
+            creator=creator
         )
-        return await shelf_item.create()
+        try:
+            # Make sure the title is in the shared catalog (display metadata,
+            # including the cover, is read from there) while creating the item
+            _, created = await asyncio.gather(
+                CatalogService.upsert(
+                    media_type=media_type,
+                    media_id=media_id,
+                    title=title,
+                    creator=creator,
+                    image_url=cover_image,
+                    overwrite=False
+                ),
+                shelf_item.insert()
+            )
+        except DuplicateKeyError:
+            raise ValueError("Item already in shelf")
+        typeahead_index.add_shelf_item(media_type.value, media_id, title, creator, cover_image)
+        return created
+
+    @staticmethod
+    async def get_user_shelves(
+        user_id: str,
+        media_type: MediaType,
+        summary: bool = False,
+        cover_count: int = settings.SHELF_SUMMARY_COVERS
+    ) -> List[dict]:
+        """All of a user's shelves for a media type with their items, in one aggregation
+
+        Default shelves without a document yet are included as virtual
+        shelves (``_id`` like ``default:book:want_to``); writing to one
+        materializes it.
+
+        Items are joined on shelf_id and their display metadata on the
+        catalog inside the same pipeline, so the whole page is one round trip.
+        With ``summary`` each shelf carries ``item_count`` and its
+        ``cover_count`` newest ``recent_items`` instead of every item.
+
+        Results are served from the per-user shelf cache until one of the
+        user's shelves of this media type is written to.
+        """
+        rendered = await ShelfService.render_user_shelves(user_id, media_type, summary, cover_count)
+        return rendered.value
 
     @staticmethod
-    async def get_user_shelves(user_id: str, media_type: MediaType) -> List[ShelfModel]:
+    async def render_user_shelves(
+        user_id: str,
+        media_type: MediaType,
+        summary: bool = False,
+        cover_count: int = settings.SHELF_SUMMARY_COVERS
+    ) -> RenderedJSON:
+        """get_user_shelves, serialized and with its ETag, as held by the shelf cache"""
+        media_type = MediaType(media_type)
+        view = f"summary:{cover_count}" if summary else "full"
         try:
-            # Debug the query parameters
-            print(f"Debug - Querying shelves for user {user_id} and media type {media_type}")
-            
-            # Get all shelves for this user and media type
-            shelves = await ShelfModel.find({
-                "user_id": user_id,
-                "media_type": media_type
-            }).to_list()
-            
-            # If no shelves exist, create default ones
-            if not shelves:
-                print("Debug - No shelves found, creating defaults")
-                shelves = await ShelfService.create_default_shelves(user_id, media_type)
-            
-            # Convert the raw dictionaries to ShelfModel instances and fetch items
-            shelf_models = []
-            for shelf_dict in shelves:
-                if isinstance(shelf_dict, dict):
-                    shelf_model = ShelfModel(**shelf_dict)
-                else:
-                    shelf_model = shelf_dict
-                
-                # Fetch shelf items
-                shelf_items = await ShelfItemModel.find({
-                    "user_id": user_id,
-                    "media_id": {"$in": shelf_model.items}
-                }).to_list()
-                
-                # Convert shelf items to dictionaries
-                items_dict = []
-                for item in shelf_items:
-                    item_dict = {
-                        "media_id": item.media_id,
-                        "title": item.title,
-                        "creator": item.creator,
-                        "cover_image": item.cover_image,
-                        "added_at": item.added_at
-                    }
-                    items_dict.append(item_dict)
-                
-                # Replace the items list with the full item details
-                shelf_model.items = items_dict
-                shelf_models.append(shelf_model)
-            
-            print(f"Debug - Returning {len(shelf_models)} shelves")
-            return shelf_models
-            
+            return await shelf_cache.get_or_load(
+                user_id,
+                media_type.value,
+                view,
+                lambda: ShelfService._load_user_shelves(user_id, media_type, summary, cover_count)
+            )
         except Exception as e:
-            print(f"Debug - Error in get_user_shelves: {str(e)}")
+            logger.warning("get_user_shelves failed for user %s: %s", user_id, e)
             raise e
 
     @staticmethod
+    async def _load_user_shelves(user_id: str, media_type: MediaType, summary: bool, cover_count: int) -> List[dict]:
+        pipeline = (
+            shelf_summary_pipeline(user_id, media_type, cover_count) if summary
+            else shelf_listing_pipeline(user_id, media_type)
+        )
+        shelves = await ShelfModel.get_motor_collection().aggregate(pipeline).to_list(length=None)
+        
+        # Default shelves come first, in their usual order; the ones that
+        # were never written to are synthesized rather than stored
+        defaults = {
+            shelf["status"]: shelf for shelf in shelves if shelf.get("shelf_type") == ShelfType.DEFAULT.value
+        }
+        virtuals = ShelfService.virtual_shelves(user_id, media_type)
+        if summary:
+            for virtual in virtuals:
+                del virtual["items"]
+                virtual.update(item_count=0, recent_items=[])
+        listed = [defaults.pop(virtual["status"], virtual) for virtual in virtuals]
+        listed_ids = {shelf["_id"] for shelf in listed}
+        shelves = listed + [shelf for shelf in shelves if shelf["_id"] not in listed_ids]
+        
+        logger.debug("Loaded %d shelves for user %s", len(shelves), user_id)
+        return shelves
+
+    @staticmethod
+    async def get_shelf_items(
+        user_id: str,
+        shelf_id: str,
+        sort: str = "added_at",
+        descending: bool = False,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """One page of a shelf's items in (sort, _id) keyset order
+
+        Each page is a single indexed range scan of ``limit + 1`` items,
+        however large the shelf, plus one catalog read for display metadata.
+        ``next_cursor`` is None on the last page. Ownership is part of the
+        filter: another user's shelf is empty.
+        """
+        pipeline, options = shelf_item_page_query(user_id, shelf_id, sort, descending, limit, cursor)
+        page = await ShelfItemModel.get_motor_collection().aggregate(pipeline, **options).to_list(length=None)
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(page[-1].get(sort), page[-1]["_id"])
+        # The cursor holds the stored sort key; the catalog may overlay title/creator
+        by_type: Dict[str, List[dict]] = {}
+        for item in page:
+            del item["_id"]
+            by_type.setdefault(item.pop("media_type"), []).append(item)
+        await asyncio.gather(*(
+            CatalogService.attach(MediaType(media_type), items) for media_type, items in by_type.items()
+        ))
+        return {"items": page, "next_cursor": next_cursor}
+
+    @staticmethod
+    @_invalidates_shelf_cache("shelf_type")
     async def remove_from_shelf(user_id: str, media_id: str, shelf_type: MediaType) -> bool:
-        """Remove an item from a user's shelf"""
+        """Remove an item from all of a user's shelves of that media type
+
+        Two round trips regardless of shelf size: one read of the shelves
+        holding the item, then its deletion concurrently with the shelves'
+        updated_at bump.
+        """
         try:
-            print(f"Debug - Looking for shelf with: user_id={user_id}, media_type={shelf_type}, media_id={media_id}")
-            
-            # First find the shelf that contains this item
-            shelf = await ShelfModel.find_one({
-                "user_id": user_id,
-                "media_type": shelf_type,
-                "items": media_id
-            })
-            
-            print(f"Debug - Found shelf: {shelf}")
-            
-            if not shelf:
+            item_filter = {"user_id": user_id, "media_id": media_id, "media_type": shelf_type.value}
+            items = ShelfItemModel.get_motor_collection()
+            shelf_ids = {item["shelf_id"] async for item in items.find(item_filter, {"shelf_id": 1})}
+            if not shelf_ids:
                 raise ValueError(f"Item with ID {media_id} not found in any shelf")
             
-            # Remove the item from the shelf's items array
-            original_items = shelf.items.copy()
-            shelf.items = [item for item in shelf.items if item != media_id]
-            print(f"Debug - Items before: {original_items}")
-            print(f"Debug - Items after: {shelf.items}")
-            
-            await shelf.save()
-            print("Debug - Saved shelf changes")
-            
-            # Also remove the shelf item if it exists
-            shelf_items = await ShelfItemModel.find({
-                "user_id": user_id,
-                "media_id": media_id
-            }).to_list()
-            
-            print(f"Debug - Found {len(shelf_items)} shelf items to delete")
-            
-            for item in shelf_items:
-                await item.delete()
-                print(f"Debug - Deleted shelf item: {item}")
-            
+            deleted, _ = await asyncio.gather(
+                items.delete_many(item_filter),
+                ShelfModel.get_motor_collection().update_many(
+                    {"_id": {"$in": [PydanticObjectId(shelf_id) for shelf_id in shelf_ids]}, "user_id": user_id},
+                    {"$set": {"updated_at": datetime.utcnow()}}
+                )
+            )
+            logger.debug("Removed %s from %d shelves", media_id, deleted.deleted_count)
             return True
         except Exception as e:
-            print(f"Debug - Error in remove_from_shelf: {str(e)}")
+            logger.warning("remove_from_shelf failed for user %s, item %s: %s", user_id, media_id, e)
             raise e
 
     @staticmethod
-    async def get_or_create_shelf(user_id: str, media_type: MediaType, status: str, shelf_type: ShelfType) -> ShelfModel:
-        # Get the appropriate shelf name based on media type and status
-        if media_type == MediaType.BOOK:
-            if status == "want_to":
-                name = "Want to Read"
-            elif status == "current":
-                name = "Currently Reading"
-            elif status == "finished":
-                name = "Finished"
-            elif status == "did_not_finish":
-                name = "Did Not Finish"
-            else:
-                name = "Custom"
-        elif media_type in [MediaType.MOVIE, MediaType.TV_SHOW]:
-            if status == "want_to":
-                name = "Want to Watch"
-            elif status == "current":
-                name = "Currently Watching"
-            elif status == "finished":
-                name = "Finished"
-            elif status == "did_not_finish":
-                name = "Did Not Finish"
-            else:
-                name = "Custom"
-        else:  # Articles
-            if status == "saved":
-                name = "Saved"
-            elif status == "finished":
-                name = "Finished"
-            else:
-                name = "Custom"
+    @_invalidates_shelf_cache("media_type")
+    async def move_item(user_id: str, media_type: MediaType, media_id: str, new_status: str) -> ShelfModel:
+        """Move an item from its current default shelf to the one for ``new_status``
 
-        # Try to find existing shelf by name and media type
-        shelf = await ShelfModel.find_one({
-            "user_id": user_id,
-            "media_type": media_type,
-            "name": name
-        })
-        
-        if shelf:
-            # Ensure the ID is converted to string
-            shelf.id = str(shelf.id)
-            return shelf
-        
-        # Create new shelf if not found
-        shelf = ShelfModel(
+        The shelf item is re-pointed and both shelves' membership updated in
+        one multi-document transaction when the deployment supports them.
+        Otherwise the two writes are just issued concurrently; membership is
+        the single shelf item document, so it is never on no shelf.
+        """
+        media_type = MediaType(media_type)
+        target = await ShelfService.get_or_create_shelf(
             user_id=user_id,
-            name=name,
             media_type=media_type,
-            status=status,
-            shelf_type=shelf_type,
-            items=[]
+            status=new_status,
+            shelf_type=ShelfType.DEFAULT
         )
-        created_shelf = await shelf.create()
-        created_shelf.id = str(created_shelf.id)
-        return created_shelf
+        shelves = ShelfModel.get_motor_collection()
+        items = ShelfItemModel.get_motor_collection()
+        defaults, on_shelves = await asyncio.gather(
+            shelves.find(
+                {"user_id": user_id, "media_type": media_type.value, "shelf_type": ShelfType.DEFAULT.value},
+                {"_id": 1}
+            ).to_list(length=None),
+            items.find(
+                {"user_id": user_id, "media_id": media_id, "media_type": media_type.value},
+                {"shelf_id": 1}
+            ).to_list(length=None)
+        )
+        default_ids = {str(shelf["_id"]) for shelf in defaults}
+        sources = sorted(item["shelf_id"] for item in on_shelves if item["shelf_id"] in default_ids)
+        if not sources:
+            raise ValueError(f"Item with ID {media_id} not found in any shelf")
+        source_id, target_id = PydanticObjectId(sources[0]), PydanticObjectId(target.id)
+        if source_id == target_id:
+            return target
+
+        now = datetime.utcnow()
+        item_filter = {
+            "user_id": user_id,
+            "shelf_id": str(source_id),
+            "media_id": media_id,
+            "media_type": media_type.value
+        }
+        item_update = {"$set": {"shelf_id": str(target_id)}}
+        touched = ({"_id": {"$in": [source_id, target_id]}, "user_id": user_id}, {"$set": {"updated_at": now}})
+        client = shelves.database.client
+        try:
+            if _supports_transactions(client):
+                async with await client.start_session() as session:
+                    async with session.start_transaction():
+                        await items.update_one(item_filter, item_update, session=session)
+                        await shelves.update_many(*touched, session=session)
+            else:
+                await asyncio.gather(
+                    items.update_one(item_filter, item_update),
+                    shelves.update_many(*touched)
+                )
+        except DuplicateKeyError:
+            raise ValueError("Item already in shelf")
+        logger.debug("Moved %s from shelf %s to %s", media_id, source_id, target_id)
+        return target
+
+    @staticmethod
+    @_invalidates_shelf_cache("operations")
+    async def apply_operations(user_id: str, operations: List[ShelfOperation]) -> List[dict]:
+        """Validate a batch of add/move/remove operations together and apply them in bulk
+
+        Current state is read in two concurrent queries; writes then go out
+        as unordered bulk_writes on shelf items, shelves and the catalog, also
+        concurrently. Each media item may appear in only one operation per
+        batch, so the unordered writes cannot conflict. Returns one
+        ``{"status": "ok"}`` or ``{"status": "error", "error": ...}`` per
+        operation, in order.
+        """
+        results: List[Optional[dict]] = [None] * len(operations)
+
+        # Virtual default shelves that are written to get materialized first
+        targets = {
+            shelf_id
+            for operation in operations
+            for shelf_id in (operation.shelf_id if operation.op == "add" else None, operation.to_shelf_id)
+            if shelf_id and parse_virtual_shelf_id(shelf_id)
+        }
+        if targets:
+            resolved = dict(zip(targets, await asyncio.gather(
+                *(ShelfService.resolve_shelf_id(user_id, shelf_id) for shelf_id in targets)
+            )))
+            operations = [
+                operation.model_copy(update={
+                    "shelf_id": resolved.get(operation.shelf_id, operation.shelf_id),
+                    "to_shelf_id": resolved.get(operation.to_shelf_id, operation.to_shelf_id)
+                })
+                for operation in operations
+            ]
+
+        shelf_ids = {
+            shelf_id
+            for operation in operations
+            for shelf_id in (operation.shelf_id, operation.from_shelf_id, operation.to_shelf_id)
+            if shelf_id
+        }
+        object_ids = []
+        for shelf_id in shelf_ids:
+            try:
+                object_ids.append(PydanticObjectId(shelf_id))
+            except InvalidId:
+                pass
+        shelves, memberships = await asyncio.gather(
+            ShelfModel.get_motor_collection().find(
+                {"_id": {"$in": object_ids}, "user_id": user_id}, {"media_type": 1}
+            ).to_list(length=None),
+            ShelfItemModel.get_motor_collection().find(
+                {"user_id": user_id, "media_id": {"$in": list({operation.media_id for operation in operations})}},
+                {"shelf_id": 1, "media_id": 1, "media_type": 1}
+            ).to_list(length=None)
+        )
+        shelf_types = {str(shelf["_id"]): shelf["media_type"] for shelf in shelves}
+        on_shelves: Dict[Tuple[str, str], Set[str]] = {}
+        for item in memberships:
+            on_shelves.setdefault((item["media_type"], item["media_id"]), set()).add(item["shelf_id"])
+
+        item_writes, item_write_ops = [], []
+        touched_shelves: Set[str] = set()
+        catalog_entries = []
+        seen: Set[Tuple[str, str]] = set()
+        now = datetime.utcnow()
+
+        def _owned(shelf_id: Optional[str], media_type: MediaType) -> bool:
+            return shelf_types.get(shelf_id) == media_type.value
+
+        for index, operation in enumerate(operations):
+            media_type = operation.media_type
+            key = (media_type.value, operation.media_id)
+            current = on_shelves.get(key, set())
+            error = None
+            if key in seen:
+                error = "Item appears in more than one operation"
+            elif operation.op == "add":
+                if not operation.shelf_id or not operation.title:
+                    error = "add requires shelf_id and title"
+                elif not _owned(operation.shelf_id, media_type):
+                    error = "Invalid shelf"
+                elif operation.shelf_id in current:
+                    error = "Item already in shelf"
+            elif operation.op == "move":
+                source = operation.from_shelf_id
+                if source is None and len(current) == 1:
+                    source = next(iter(current))
+                if not operation.to_shelf_id:
+                    error = "move requires to_shelf_id"
+                elif source is None:
+                    error = "Item is on several shelves; from_shelf_id is required" if current else "Item not found in any shelf"
+                elif source not in current:
+                    error = "Item not found in that shelf"
+                elif not _owned(operation.to_shelf_id, media_type):
+                    error = "Invalid shelf"
+                elif operation.to_shelf_id in current:
+                    error = "Item already in shelf"
+            elif not current:
+                error = "Item not found in any shelf"
+            elif operation.shelf_id and operation.shelf_id not in current:
+                error = "Item not found in that shelf"
+            seen.add(key)
+            if error:
+                results[index] = {"status": "error", "error": error}
+                continue
+
+            item_filter = {"user_id": user_id, "media_id": operation.media_id, "media_type": media_type.value}
+            if operation.op == "add":
+                item_writes.append(InsertOne({
+                    "user_id": user_id,
+                    "shelf_id": operation.shelf_id,
+                    "media_id": operation.media_id,
+                    "media_type": media_type.value,
+                    "title": operation.title,
+                    "creator": operation.creator,
+                    "cover_image": None,
+                    "added_at": now
+                }))
+                touched_shelves.add(operation.shelf_id)
+                catalog_entries.append({
+                    "media_type": media_type,
+                    "media_id": operation.media_id,
+                    "title": operation.title,
+                    "creator": operation.creator,
+                    "image_url": operation.image_url
+                })
+            elif operation.op == "move":
+                item_writes.append(UpdateOne(
+                    {**item_filter, "shelf_id": source},
+                    {"$set": {"shelf_id": operation.to_shelf_id}}
+                ))
+                touched_shelves.update((source, operation.to_shelf_id))
+            else:
+                if operation.shelf_id:
+                    item_filter["shelf_id"] = operation.shelf_id
+                    touched_shelves.add(operation.shelf_id)
+                else:
+                    touched_shelves.update(current)
+                item_writes.append(DeleteMany(item_filter))
+            item_write_ops.append(index)
+            results[index] = {"status": "ok"}
+
+        async def _bulk(collection, writes):
+            if writes:
+                await collection.bulk_write(writes, ordered=False)
+
+        shelf_writes = [UpdateMany(
+            {"_id": {"$in": [PydanticObjectId(shelf_id) for shelf_id in touched_shelves]}, "user_id": user_id},
+            {"$set": {"updated_at": now}}
+        )] if touched_shelves else []
+        item_outcome, shelf_outcome, catalog_outcome = await asyncio.gather(
+            _bulk(ShelfItemModel.get_motor_collection(), item_writes),
+            _bulk(ShelfModel.get_motor_collection(), shelf_writes),
+            CatalogService.upsert_many(catalog_entries),
+            return_exceptions=True
+        )
+        if isinstance(item_outcome, BulkWriteError):
+            # Shelf item writes fail per operation (e.g. the unique index);
+            # their indexes map back through item_write_ops
+            for write_error in item_outcome.details.get("writeErrors", []):
+                index = item_write_ops[write_error["index"]]
+                duplicate = write_error.get("code") == 11000
+                results[index] = {
+                    "status": "error",
+                    "error": "Item already in shelf" if duplicate else write_error.get("errmsg")
+                }
+        elif isinstance(item_outcome, Exception):
+            raise item_outcome
+        # The item writes stand either way: a missed updated_at bump or
+        # catalog fill-in does not fail the operations
+        if isinstance(shelf_outcome, Exception):
+            logger.warning("Bulk shelf update failed for user %s: %s", user_id, shelf_outcome)
+        if isinstance(catalog_outcome, Exception):
+            logger.warning("Bulk catalog upsert failed for user %s: %s", user_id, catalog_outcome)
+
+        for operation, result in zip(operations, results):
+            if operation.op == "add" and result["status"] == "ok":
+                typeahead_index.add_shelf_item(
+                    operation.media_type.value, operation.media_id,
+                    operation.title, operation.creator, operation.image_url
+                )
+        return results
+
+    @staticmethod
+    async def get_or_create_shelf(user_id: str, media_type: MediaType, status: str, shelf_type: ShelfType) -> ShelfModel:
+        """The user's default shelf for a status, materializing it with one upsert if needed
+
+        Cached listings are only invalidated when the upsert inserted, which
+        it did when the shelf comes back with the _id it proposed.
+        """
+        status = ShelfStatus(status)
+        name = ShelfService.default_shelf_name(media_type, status) or "Custom"
+        shelf_filter = {
+            "user_id": user_id,
+            "media_type": media_type.value,
+            "shelf_type": shelf_type.value,
+            "status": status.value
+        }
+        shelves = ShelfModel.get_motor_collection()
+        new_id = ObjectId()
+        try:
+            doc = await shelves.find_one_and_update(
+                shelf_filter,
+                {"$setOnInsert": {"_id": new_id, **_shelf_document(user_id, name, media_type, status, shelf_type)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # A concurrent request materialized it first
+            doc = await shelves.find_one(shelf_filter)
+        if doc["_id"] == new_id:
+            await shelf_cache.invalidate(user_id, media_type.value)
+        shelf = ShelfModel.model_validate(doc)
+        # Ensure the ID is converted to string
+        shelf.id = str(shelf.id)
+        return shelf
+
+    @staticmethod
+    async def resolve_shelf_id(user_id: str, shelf_id: str) -> str:
+        """Real id for ``shelf_id``, materializing a virtual default shelf on first write"""
+        virtual = parse_virtual_shelf_id(shelf_id)
+        if virtual is None:
+            return shelf_id
+        media_type, status = virtual
+        shelf = await ShelfService.get_or_create_shelf(user_id, media_type, status, ShelfType.DEFAULT)
+        return str(shelf.id)
 
     @staticmethod
     async def add_item_to_shelf(
@@ -285,8 +855,6 @@ class ShelfService:
         image_url: Optional[str] = None,
         creator: Optional[str] = None
     ) -> ShelfItemModel:
-        print(f"Debug - Adding item to shelf: media_type={media_type}, status={status}, shelf_type={shelf_type}")
-        
         # Get or create the appropriate shelf
         shelf = await ShelfService.get_or_create_shelf(
             user_id=user_id,
@@ -295,7 +863,7 @@ class ShelfService:
             shelf_type=ShelfType.DEFAULT  # Always use DEFAULT for standard shelves
         )
         
-        print(f"Debug - Found/Created shelf: {shelf.name} (ID: {shelf.id})")
+        logger.debug("Adding %s %s to shelf %s (%s)", media_type, media_id, shelf.id, status)
         
         # Add the item to the shelf
         return await ShelfService.add_to_shelf(
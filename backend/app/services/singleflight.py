@@ -0,0 +1,64 @@
+# app/services/singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one in-flight task.
+
+    The shared task keeps running while at least one caller is waiting for
+    it. A cancelled caller only detaches itself; the fetch is cancelled once
+    the last waiter goes away.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.calls = 0
+        self.collapsed = 0
+        self.cancelled = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.create_task(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.collapsed += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            # Only the caller was cancelled if the shared task is still running
+            if not call.task.done() and call.waiters == 1:
+                self.cancelled += 1
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: str, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Retrieve the exception so failures nobody awaited are not logged as unhandled
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "collapsed": self.collapsed,
+            "cancelled": self.cancelled,
+            "in_flight": len(self._calls)
+        }
+
+# Shared by every upstream lookup in the media routes
+upstream_flight = SingleFlight()
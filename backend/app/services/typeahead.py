@@ -0,0 +1,304 @@
+# app/services/typeahead.py
+import asyncio
+import heapq
+import logging
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+import orjson
+from config import Settings
+from app.database.models.shelf import MediaItem
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+")
+MIN_PREFIX = 2
+MAX_PREFIX = 12
+SNAPSHOT_VERSION = 1
+
+# Search result "type" -> quick search group
+GROUPS = {
+    "movie": "movies",
+    "tv": "tv_shows",
+    "book": "books",
+}
+
+# Shelf MediaType value -> search result "type"
+SHELF_TYPES = {
+    "book": "book",
+    "movie": "movie",
+    "tv_show": "tv",
+}
+
+# Popularity added per source of a title
+SEARCH_HIT_WEIGHT = 1.0
+DETAIL_VIEW_WEIGHT = 2.0
+SHELVED_WEIGHT = 5.0
+# Titles seeded from the catalog at startup rank like a single search hit
+CATALOG_WEIGHT = SEARCH_HIT_WEIGHT
+CATALOG_SEED_BATCH = 1000
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+class TypeaheadEntry:
+    __slots__ = ("key", "group", "result", "creator", "popularity", "tokens", "title")
+
+    def __init__(self, key: str, group: str, result: dict, creator: Optional[str], popularity: float):
+        self.key = key
+        self.group = group
+        self.result = result
+        self.creator = creator
+        self.popularity = popularity
+        self.title = (result.get("title") or "").lower()
+        self.tokens = set(tokenize(result.get("title")) + tokenize(creator) + tokenize(result.get("subtitle")))
+
+class TypeaheadIndex:
+    """In-memory prefix index over titles, creators and years.
+
+    Every token is posted under each of its prefixes (up to MAX_PREFIX
+    characters), so a lookup is a few dict hits and a set intersection.
+    Results are ranked by popularity, with a boost for title-prefix matches.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: Dict[str, TypeaheadEntry] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, result: dict, creator: Optional[str] = None, weight: float = SEARCH_HIT_WEIGHT):
+        """Add or bump a search-result-shaped item (id, title, subtitle, image_url, type)"""
+        group = GROUPS.get(result.get("type"))
+        if group is None or not result.get("id") or not result.get("title"):
+            return
+        key = f"{result['type']}:{result['id']}"
+        existing = self._entries.get(key)
+        popularity = weight + (existing.popularity if existing else 0.0)
+        if existing:
+            self._unpost(existing)
+            creator = creator or existing.creator
+            result = {**existing.result, **{k: v for k, v in result.items() if v}}
+        entry = TypeaheadEntry(key, group, result, creator, popularity)
+        self._entries[key] = entry
+        self._post(entry)
+        if len(self._entries) > self.max_entries:
+            self._trim()
+
+    def add_results(self, results: Iterable[dict]):
+        for result in results:
+            self.add(result)
+
+    def add_shelf_item(self, media_type: str, media_id: str, title: str, creator: Optional[str], cover_image: Optional[str]):
+        self._add_media(media_type, media_id, title, creator, None, cover_image, SHELVED_WEIGHT)
+
+    def add_catalog_entry(self, entry: dict) -> bool:
+        """Add a media_catalog document unless the title is indexed already"""
+        result_type = SHELF_TYPES.get(entry.get("media_type"))
+        if result_type is None or f"{result_type}:{entry.get('media_id')}" in self._entries:
+            return False
+        self._add_media(
+            entry["media_type"], entry["media_id"], entry.get("title"), entry.get("creator"),
+            entry.get("year"), entry.get("image_url"), CATALOG_WEIGHT
+        )
+        return True
+
+    def _add_media(
+        self,
+        media_type: str,
+        media_id: str,
+        title: Optional[str],
+        creator: Optional[str],
+        year: Optional[int],
+        image_url: Optional[str],
+        weight: float
+    ):
+        result_type = SHELF_TYPES.get(media_type)
+        if result_type is None:
+            return
+        self.add(
+            {
+                "id": media_id,
+                "title": title,
+                # Book subtitles are the author; movie/TV subtitles are the year
+                "subtitle": creator if result_type == "book" else (str(year) if year else None),
+                "image_url": image_url,
+                "type": result_type
+            },
+            creator=creator,
+            weight=weight
+        )
+
+    def search(self, query: str, limit: int = 5) -> Dict[str, List[dict]]:
+        """Return up to ``limit`` results per group for a (prefix) query"""
+        tokens = tokenize(query)
+        grouped: Dict[str, List[dict]] = {group: [] for group in GROUPS.values()}
+        if not tokens:
+            return grouped
+
+        candidates: Optional[Set[str]] = None
+        for token in sorted(tokens, key=len, reverse=True):
+            if len(token) < MIN_PREFIX:
+                continue
+            posting = self._postings.get(token[:MAX_PREFIX])
+            if not posting:
+                self.misses += 1
+                return grouped
+            candidates = posting if candidates is None else candidates & posting
+            if not candidates:
+                self.misses += 1
+                return grouped
+        if candidates is None:
+            return grouped
+
+        phrase = " ".join(tokens)
+        long_tokens = [token for token in tokens if len(token) > MAX_PREFIX]
+        by_group: Dict[str, List[TypeaheadEntry]] = {group: [] for group in GROUPS.values()}
+        for key in candidates:
+            entry = self._entries[key]
+            if long_tokens and not all(
+                any(own.startswith(token) for own in entry.tokens) for token in long_tokens
+            ):
+                continue
+            by_group[entry.group].append(entry)
+
+        for group, entries in by_group.items():
+            best = heapq.nlargest(limit, entries, key=lambda entry: self._score(entry, phrase))
+            grouped[group] = [entry.result for entry in best]
+        self.hits += 1
+        return grouped
+
+    def _score(self, entry: TypeaheadEntry, phrase: str) -> float:
+        score = entry.popularity
+        if entry.title == phrase:
+            score *= 4
+        elif entry.title.startswith(phrase):
+            score *= 2
+        return score
+
+    def _post(self, entry: TypeaheadEntry):
+        for token in entry.tokens:
+            for size in range(MIN_PREFIX, min(len(token), MAX_PREFIX) + 1):
+                self._postings.setdefault(token[:size], set()).add(entry.key)
+
+    def _unpost(self, entry: TypeaheadEntry):
+        for token in entry.tokens:
+            for size in range(MIN_PREFIX, min(len(token), MAX_PREFIX) + 1):
+                posting = self._postings.get(token[:size])
+                if posting is not None:
+                    posting.discard(entry.key)
+                    if not posting:
+                        del self._postings[token[:size]]
+
+    def _trim(self):
+        """Drop the least popular tenth of the index"""
+        drop = max(1, len(self._entries) // 10)
+        for entry in heapq.nsmallest(drop, self._entries.values(), key=lambda entry: entry.popularity):
+            self._unpost(entry)
+            del self._entries[entry.key]
+
+    async def snapshot(self, path: str):
+        """Write entries (not postings, which are rebuilt on restore) atomically
+
+        Entries are listed on the event loop; encoding and file I/O run in
+        a worker thread.
+        """
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "entries": [
+                {
+                    "result": entry.result,
+                    "creator": entry.creator,
+                    "popularity": entry.popularity
+                }
+                for entry in self._entries.values()
+            ]
+        }
+        await asyncio.to_thread(_write_snapshot, path, data)
+
+    async def restore(self, path: str) -> int:
+        data = await asyncio.to_thread(_read_snapshot, path)
+        if data is None or data.get("version") != SNAPSHOT_VERSION:
+            return 0
+        for item in data.get("entries", []):
+            self.add(item["result"], creator=item.get("creator"), weight=item.get("popularity", 0.0))
+        return len(self._entries)
+
+    async def seed_from_catalog(self) -> int:
+        """Add catalog titles not indexed yet, most recently updated first
+
+        Covers every title viewed or shelved before this process started,
+        so a deploy without a snapshot does not start cold.
+        """
+        added = 0
+        cursor = MediaItem.get_motor_collection().find(
+            {"media_type": {"$in": list(SHELF_TYPES)}},
+            {"media_type": 1, "media_id": 1, "title": 1, "creator": 1, "year": 1, "image_url": 1},
+            sort=[("updated_at", -1)],
+            limit=self.max_entries,
+            batch_size=CATALOG_SEED_BATCH
+        )
+        seen = 0
+        async for entry in cursor:
+            added += self.add_catalog_entry(entry)
+            seen += 1
+            if seen % CATALOG_SEED_BATCH == 0:
+                # Let requests run between batches
+                await asyncio.sleep(0)
+        return added
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "prefixes": len(self._postings),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+def _write_snapshot(path: str, data: dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(data))
+    os.replace(tmp_path, path)
+
+def _read_snapshot(path: str) -> Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+typeahead_index = TypeaheadIndex(settings.TYPEAHEAD_MAX_ENTRIES)
+
+async def restore_typeahead_index():
+    try:
+        count = await typeahead_index.restore(settings.TYPEAHEAD_SNAPSHOT_PATH)
+        logger.info("Typeahead index restored with %d entries", count)
+    except Exception as e:
+        logger.warning("Typeahead restore failed: %s", e)
+
+async def seed_typeahead_index():
+    try:
+        count = await typeahead_index.seed_from_catalog()
+        logger.info("Typeahead index seeded with %d catalog titles", count)
+    except Exception as e:
+        logger.warning("Typeahead catalog seed failed: %s", e)
+
+async def snapshot_typeahead_index():
+    try:
+        await typeahead_index.snapshot(settings.TYPEAHEAD_SNAPSHOT_PATH)
+    except Exception as e:
+        logger.warning("Typeahead snapshot failed: %s", e)
+
+async def snapshot_typeahead_periodically():
+    while True:
+        await asyncio.sleep(settings.TYPEAHEAD_SNAPSHOT_INTERVAL_SECONDS)
+        await snapshot_typeahead_index()
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 from urllib.parse import quote_plus
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -11,9 +11,87 @@ class Settings(BaseSettings):
     MONGODB_PASSWORD: str
     MONGODB_CLUSTER: str
     MONGODB_NAME: str = "shelfd_db"
+    # Build declared indexes in a background task after startup instead of in init_beanie;
+    # the unique indexes writes depend on (main.STARTUP_INDEX_MODELS) are built before serving
+    MONGODB_BACKGROUND_INDEXES: bool = True
     TMDB_API_KEY: str
     TMDB_BASE_URL: str
     GOOGLE_BOOKS_BASE_URL: str
+    # Quick search fan-out: overall deadline plus a timeout per provider
+    SEARCH_DEADLINE_SECONDS: float = 2.5
+    TMDB_SEARCH_TIMEOUT_SECONDS: float = 2.0
+    GOOGLE_BOOKS_SEARCH_TIMEOUT_SECONDS: float = 2.0
+    # Pooled upstream HTTP clients (one per provider)
+    UPSTREAM_MAX_CONNECTIONS: int = 20
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    UPSTREAM_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    UPSTREAM_TIMEOUT_SECONDS: float = 10.0
+    UPSTREAM_HTTP2: bool = True
+    UPSTREAM_WARMUP_CONNECTIONS: int = 2
+    # Upstream rate limits (token bucket) and 429 retry policy
+    TMDB_RATE_LIMIT_PER_SECOND: float = 40.0
+    TMDB_RATE_LIMIT_BURST: float = 20.0
+    GOOGLE_BOOKS_RATE_LIMIT_PER_SECOND: float = 10.0
+    GOOGLE_BOOKS_RATE_LIMIT_BURST: float = 10.0
+    IMAGE_RATE_LIMIT_PER_SECOND: float = 50.0
+    IMAGE_RATE_LIMIT_BURST: float = 50.0
+    UPSTREAM_MAX_RETRIES: int = 2
+    UPSTREAM_BACKOFF_BASE_SECONDS: float = 0.5
+    UPSTREAM_BACKOFF_MAX_SECONDS: float = 10.0
+    # Per-provider circuit breaker: open after N consecutive failures, then
+    # allow half-open trial requests once the recovery period has passed
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RECOVERY_SECONDS: float = 30.0
+    BREAKER_HALF_OPEN_MAX_CALLS: int = 1
+    # Media metadata cache: freshness per media type, then served stale
+    # (while refreshing) for MEDIA_CACHE_STALE_SECONDS before expiring
+    MEDIA_CACHE_MOVIE_TTL_SECONDS: int = 86400
+    MEDIA_CACHE_TV_TTL_SECONDS: int = 21600
+    MEDIA_CACHE_BOOK_TTL_SECONDS: int = 604800
+    MEDIA_CACHE_DEFAULT_TTL_SECONDS: int = 3600
+    MEDIA_CACHE_STALE_SECONDS: int = 604800
+    MEDIA_CACHE_MEMORY_MAX_BYTES: int = 64 * 1024 * 1024
+    MEDIA_CACHE_NEGATIVE_TTL_SECONDS: int = 300
+    # Batch detail endpoint
+    MEDIA_BATCH_MAX_ITEMS: int = 100
+    MEDIA_BATCH_CONCURRENCY: int = 8
+    # Bulk shelf operations endpoint
+    SHELF_BULK_MAX_OPERATIONS: int = 500
+    # Shelf item pages
+    SHELF_PAGE_DEFAULT_LIMIT: int = 50
+    SHELF_PAGE_MAX_LIMIT: int = 200
+    # Shelf overview (summary listing)
+    SHELF_SUMMARY_COVERS: int = 4
+    SHELF_SUMMARY_MAX_COVERS: int = 20
+    # Per-user shelf listing cache, invalidated on writes. Invalidations only
+    # reach caches in the same process (LocalInvalidationChannel), so this is
+    # only correct with a single worker; with more, each serves its own
+    # listings up to SHELF_CACHE_TTL_SECONDS stale after another's writes
+    SHELF_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    SHELF_CACHE_TTL_SECONDS: int = 300
+    # Cover image proxy and its on-disk cache
+    IMAGE_CACHE_DIR: str = "data/images"
+    IMAGE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    IMAGE_MAX_BYTES: int = 5 * 1024 * 1024
+    # Sampled query log and the background cache warmer fed by it
+    QUERY_LOG_SAMPLE_RATE: float = 0.1
+    QUERY_LOG_FLUSH_SECONDS: int = 60
+    WARM_STARTUP_DELAY_SECONDS: int = 5
+    WARM_INTERVAL_SECONDS: int = 1800
+    WARM_TOP_K_QUERIES: int = 50
+    WARM_TOP_K_TITLES: int = 100
+    WARM_CONCURRENCY: int = 2
+    # Local typeahead index consulted before the upstream providers
+    TYPEAHEAD_MAX_ENTRIES: int = 50000
+    TYPEAHEAD_MIN_RESULTS: int = 5
+    TYPEAHEAD_SNAPSHOT_PATH: str = "data/typeahead_snapshot.json"
+    TYPEAHEAD_SNAPSHOT_INTERVAL_SECONDS: int = 300
+    # Logging: root level, per-logger overrides (e.g. {"app.services.http_client": "DEBUG"}),
+    # json or text output, and the fraction of DEBUG records kept when enabled
+    LOG_LEVEL: str = "INFO"
+    LOG_MODULE_LEVELS: Dict[str, str] = {"httpx": "WARNING"}
+    LOG_FORMAT: str = "json"
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1
     # Default CORS settings that can be overridden by environment variables
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "https://shelfd-prototype.vercel.app"]
 
@@ -1,19 +1,64 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from app.logging_config import setup_logging, stop_logging, request_id, new_request_id
 from app.database.client import connect_to_mongo, close_mongo_connection
+from app.database.indexes import index_builder
 from app.routes import media, auth, shelf
+from app.services.http_client import start_upstream_clients, close_upstream_clients, upstream_stats
+from app.services.media_cache import media_cache
+from app.services.image_cache import image_cache
+from app.services.shelf_cache import shelf_cache
+from app.services.cache_warmer import cache_warmer, query_log
+from app.services.singleflight import upstream_flight
+from app.services.typeahead import (
+    typeahead_index,
+    restore_typeahead_index,
+    seed_typeahead_index,
+    snapshot_typeahead_index,
+    snapshot_typeahead_periodically,
+)
+import asyncio
+import logging
 from beanie import init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.database.models.user import User
-from app.database.models.shelf import ShelfModel, ShelfItemModel
+from app.database.models.shelf import ShelfModel, ShelfItemModel, MediaItem
+from app.database.models.cache import MediaCacheEntry
+from app.database.models.query_log import QueryStat
 from config import Settings
 import os
 
-app = FastAPI(title="Shelfd API")
-
 # Get environment-specific settings
 settings = Settings()
-print(f"CORS Origins configured: {settings.CORS_ORIGINS}")
+setup_logging(
+    level=settings.LOG_LEVEL,
+    module_levels=settings.LOG_MODULE_LEVELS,
+    fmt=settings.LOG_FORMAT,
+    debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE
+)
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Shelfd API")
+
+DOCUMENT_MODELS = [User, ShelfModel, ShelfItemModel, MediaItem, MediaCacheEntry, QueryStat]
+# Writes rely on these models' unique indexes to reject duplicates (users,
+# shelf items, default shelves, catalog entries), so they are confirmed
+# before serving even when the rest build in the background; duplicates let
+# in while they build would also make the builds fail for good
+STARTUP_INDEX_MODELS = [User, ShelfModel, ShelfItemModel, MediaItem]
+logger.info("CORS Origins configured: %s", settings.CORS_ORIGINS)
+
+# Tag every log record written while handling a request with its correlation ID
+@app.middleware("http")
+async def correlation_id_middleware(request: Request, call_next):
+    current_id = request.headers.get("X-Request-ID") or new_request_id()
+    token = request_id.set(current_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id.reset(token)
+    response.headers["X-Request-ID"] = current_id
+    return response
 
 # CORS middleware configuration
 app.add_middleware(
@@ -45,18 +90,90 @@ async def startup_db_client():
         
         await init_beanie(
             database=client[settings.MONGODB_NAME],
-            document_models=[User, ShelfModel, ShelfItemModel]
+            document_models=DOCUMENT_MODELS,
+            skip_indexes=settings.MONGODB_BACKGROUND_INDEXES
         )
-        print(f"Successfully connected to MongoDB and initialized Beanie!")
+        logger.info("Successfully connected to MongoDB and initialized Beanie")
+        # A no-op when init_beanie already built them; records their status either way
+        await index_builder.build(STARTUP_INDEX_MODELS)
+        if settings.MONGODB_BACKGROUND_INDEXES:
+            # Build the remaining declared indexes without holding up startup
+            app.state.index_build = asyncio.create_task(index_builder.build(
+                [model for model in DOCUMENT_MODELS if model not in STARTUP_INDEX_MODELS]
+            ))
     except Exception as e:
-        print(f"Failed to connect to MongoDB: {str(e)}")
+        logger.error("Failed to connect to MongoDB: %s", e)
         raise e
 
+@app.on_event("startup")
+async def startup_upstream_clients():
+    await start_upstream_clients()
+
+@app.on_event("startup")
+async def startup_shelf_cache():
+    await shelf_cache.start()
+
+@app.on_event("startup")
+async def startup_typeahead_index():
+    await restore_typeahead_index()
+    # Catalog titles missing from the snapshot are added in the background
+    app.state.typeahead_seed = asyncio.create_task(seed_typeahead_index())
+    app.state.typeahead_snapshots = asyncio.create_task(snapshot_typeahead_periodically())
+
+@app.on_event("startup")
+async def startup_cache_warmer():
+    # Runs in the background so warming never delays readiness
+    app.state.cache_warmer = asyncio.create_task(cache_warmer.run_forever())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    index_build = getattr(app.state, "index_build", None)
+    if index_build is not None:
+        index_build.cancel()
     await close_mongo_connection()
 
+@app.on_event("shutdown")
+async def shutdown_upstream_clients():
+    await close_upstream_clients()
+
+@app.on_event("shutdown")
+async def shutdown_shelf_cache():
+    await shelf_cache.close()
+
+@app.on_event("shutdown")
+async def shutdown_cache_warmer():
+    app.state.cache_warmer.cancel()
+    try:
+        await query_log.flush()
+    except Exception as e:
+        logger.warning("Query log flush failed: %s", e)
+
+@app.on_event("shutdown")
+async def shutdown_typeahead_index():
+    app.state.typeahead_seed.cancel()
+    app.state.typeahead_snapshots.cancel()
+    await snapshot_typeahead_index()
+
+@app.on_event("shutdown")
+async def shutdown_logging():
+    # Registered last so the other shutdown hooks' records are flushed too
+    stop_logging()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+# Runtime stats for the upstream connection pools and caches
+@app.get("/metrics")
+async def metrics():
+    return {
+        "upstreams": upstream_stats(),
+        "media_cache": media_cache.stats(),
+        "singleflight": upstream_flight.stats(),
+        "typeahead": typeahead_index.stats(),
+        "image_cache": image_cache.stats(),
+        "shelf_cache": shelf_cache.stats(),
+        "cache_warmer": cache_warmer.stats(),
+        "indexes": index_builder.stats()
+    }
@@ -0,0 +1,144 @@
+"""Compare Mongo round trips and latency of the shelf listing read paths.
+
+Seeds a throwaway database with one user's shelves and items, then times
+the legacy per-shelf queries (1 + N round trips, plus the catalog) against
+the single aggregation used by ShelfService.get_user_shelves.
+
+    python -m scripts.benchmark_shelf_listing --shelves 8 --items 50 --runs 20
+
+Run from the backend directory against a local MongoDB; pass --uri to
+target another server. The benchmark database is dropped afterwards.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from app.database.models.shelf import ShelfModel, ShelfItemModel, MediaItem
+from app.database.schemas.shelf import MediaType, ShelfStatus, ShelfType
+from app.services.catalog_service import CatalogService
+from app.services.shelf_cache import shelf_cache
+from app.services.shelf_service import ShelfService
+
+USER_ID = "benchmark-user"
+MEDIA_TYPE = MediaType.BOOK
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name in ("find", "aggregate", "getMore", "insert"):
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+async def seed(shelf_count: int, item_count: int):
+    now = datetime.utcnow()
+    shelves = [
+        ShelfModel(
+            user_id=USER_ID,
+            name=f"Shelf {i}",
+            media_type=MEDIA_TYPE,
+            shelf_type=ShelfType.CUSTOM,
+            status=ShelfStatus.WANT_TO
+        )
+        for i in range(shelf_count)
+    ]
+    for shelf in shelves:
+        await shelf.insert()
+    items, catalog = [], []
+    for s, shelf in enumerate(shelves):
+        for i in range(item_count):
+            media_id = f"book-{s}-{i}"
+            items.append(ShelfItemModel(
+                user_id=USER_ID,
+                shelf_id=str(shelf.id),
+                media_id=media_id,
+                media_type=MEDIA_TYPE,
+                title=f"Book {s}-{i}",
+                added_at=now + timedelta(seconds=i)
+            ))
+            catalog.append(MediaItem(
+                media_type=MEDIA_TYPE,
+                media_id=media_id,
+                title=f"Book {s}-{i}",
+                creator="Author",
+                image_url=f"https://books.google.com/books/content?id={media_id}"
+            ))
+    await ShelfItemModel.insert_many(items)
+    await MediaItem.insert_many(catalog)
+
+async def legacy_listing():
+    """The pre-aggregation path: shelves, then each shelf's items"""
+    shelves = await ShelfModel.find({"user_id": USER_ID, "media_type": MEDIA_TYPE}).to_list()
+    result = []
+    for shelf in shelves:
+        shelf_items = await ShelfItemModel.find({"user_id": USER_ID, "shelf_id": str(shelf.id)}).to_list()
+        result.append({
+            "_id": str(shelf.id),
+            "name": shelf.name,
+            "items": [
+                {"media_id": item.media_id, "title": item.title, "added_at": item.added_at}
+                for item in shelf_items
+            ]
+        })
+    await CatalogService.attach(MEDIA_TYPE, [item for shelf in result for item in shelf["items"]])
+    return result
+
+async def aggregated_listing():
+    await shelf_cache.invalidate(USER_ID, MEDIA_TYPE.value)  # measure the query, not the cache
+    return await ShelfService.get_user_shelves(USER_ID, MEDIA_TYPE)
+
+async def cached_listing():
+    return await ShelfService.get_user_shelves(USER_ID, MEDIA_TYPE)
+
+async def measure(name: str, listing, counter: CommandCounter, runs: int):
+    await listing()  # warm up connections and the plan cache
+    timings, round_trips = [], []
+    for _ in range(runs):
+        counter.count = 0
+        started = time.perf_counter()
+        await listing()
+        timings.append((time.perf_counter() - started) * 1000)
+        round_trips.append(counter.count)
+    print(
+        f"{name:<12} round trips: {statistics.median(round_trips):>4.0f}   "
+        f"median: {statistics.median(timings):8.2f} ms   "
+        f"p95: {sorted(timings)[int(len(timings) * 0.95) - 1]:8.2f} ms"
+    )
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="shelfd_benchmark")
+    parser.add_argument("--shelves", type=int, default=8)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(args.uri, event_listeners=[counter])
+    database = client[args.database]
+    await init_beanie(database=database, document_models=[ShelfModel, ShelfItemModel, MediaItem])
+    try:
+        await seed(args.shelves, args.items)
+        print(f"{args.shelves} shelves x {args.items} items, {args.runs} runs")
+        await measure("legacy", legacy_listing, counter, args.runs)
+        await measure("aggregation", aggregated_listing, counter, args.runs)
+        await measure("cached", cached_listing, counter, args.runs)
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
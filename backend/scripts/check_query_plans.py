@@ -0,0 +1,189 @@
+"""Fail if any ShelfService query shape is planned as a collection scan.
+
+Creates the declared indexes in a throwaway database, seeds a little data,
+runs explain() on each query ShelfService issues and exits non-zero if a
+winning plan (or a $lookup inside the shelf listing aggregation) scans a
+whole collection. Point it at a local mongod:
+
+    python -m scripts.check_query_plans --uri mongodb://localhost:27017
+
+Run from the backend directory. Aggregations and catalog reads are built
+with the same builders the services use (shelf_listing_pipeline,
+shelf_item_page_query, catalog_many_filter, ...), collation included, so
+they cannot drift. The single-filter finds below mirror filters written
+inline in ShelfService; keep them in step when changing one there.
+"""
+import argparse
+import asyncio
+import sys
+from typing import Iterator, List, Optional, Tuple
+
+from beanie import init_beanie
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.database.indexes import index_builder
+from app.database.models.shelf import ShelfModel, ShelfItemModel, MediaItem
+from app.database.schemas.shelf import MediaType, ShelfStatus, ShelfType
+from app.services.catalog_service import catalog_key_filter, catalog_many_filter
+from app.services.shelf_service import (
+    encode_cursor,
+    shelf_item_page_query,
+    shelf_listing_pipeline,
+    shelf_summary_pipeline
+)
+
+USER_ID = "plan-check-user"
+MEDIA_TYPE = MediaType.BOOK.value
+SHELF_ID = str(ObjectId())
+MODELS = [ShelfModel, ShelfItemModel, MediaItem]
+
+def aggregate(collection: str, pipeline: List[dict], options: Optional[dict] = None) -> dict:
+    """An aggregate command as the service sends it, options such as collation included"""
+    return {"aggregate": collection, "pipeline": pipeline, "cursor": {}, **(options or {})}
+
+# (description, command) for every query ShelfService issues
+QUERIES: List[Tuple[str, dict]] = [
+    (
+        "add_to_shelf: owned shelf",
+        {"find": "shelves", "filter": {"_id": ObjectId(SHELF_ID), "user_id": USER_ID}},
+    ),
+    (
+        "get_or_create_shelf: default shelf for a status",
+        {"find": "shelves", "filter": {
+            "user_id": USER_ID, "media_type": MEDIA_TYPE, "shelf_type": "default", "status": "finished"
+        }},
+    ),
+    (
+        "move_item: the user's default shelves",
+        {"find": "shelves", "filter": {"user_id": USER_ID, "media_type": MEDIA_TYPE, "shelf_type": "default"}},
+    ),
+    (
+        "move_item: shelf item on the source shelf",
+        {"find": "shelf_items", "filter": {
+            "user_id": USER_ID, "shelf_id": SHELF_ID, "media_id": "book-1", "media_type": MEDIA_TYPE
+        }},
+    ),
+    (
+        "remove_from_shelf, move_item: shelf items for a media id",
+        {"find": "shelf_items", "filter": {"user_id": USER_ID, "media_id": "book-1", "media_type": MEDIA_TYPE}},
+    ),
+    (
+        "get_user_shelves: listing aggregation",
+        aggregate("shelves", shelf_listing_pipeline(USER_ID, MediaType.BOOK)),
+    ),
+    (
+        "get_user_shelves: summary aggregation",
+        aggregate("shelves", shelf_summary_pipeline(USER_ID, MediaType.BOOK, 4)),
+    ),
+    (
+        "get_shelf_items: first page by added_at",
+        aggregate("shelf_items", *shelf_item_page_query(USER_ID, SHELF_ID, "added_at", True, 50)),
+    ),
+    (
+        "get_shelf_items: page after a title cursor",
+        aggregate("shelf_items", *shelf_item_page_query(
+            USER_ID, SHELF_ID, "title", False, 50, encode_cursor("book-2", ObjectId())
+        )),
+    ),
+    (
+        "get_shelf_items: page after a creator cursor, descending",
+        aggregate("shelf_items", *shelf_item_page_query(
+            USER_ID, SHELF_ID, "creator", True, 50, encode_cursor(None, ObjectId())
+        )),
+    ),
+    (
+        "get_shelf_items, CatalogService.attach: catalog overlay",
+        {"find": "media_catalog", "filter": catalog_many_filter(MediaType.BOOK, ["book-1", "book-2"])},
+    ),
+    (
+        "apply_operations: owned shelves",
+        {"find": "shelves", "filter": {"_id": {"$in": [ObjectId(SHELF_ID)]}, "user_id": USER_ID}},
+    ),
+    (
+        "apply_operations: current memberships",
+        {"find": "shelf_items", "filter": {"user_id": USER_ID, "media_id": {"$in": ["book-1", "book-2"]}}},
+    ),
+    (
+        "0001_shelf_membership: existing shelf items",
+        {"find": "shelf_items", "filter": {"user_id": {"$in": [USER_ID]}, "shelf_id": {"$in": [SHELF_ID]}}},
+    ),
+    (
+        "add_to_shelf: catalog upsert filter",
+        {"find": "media_catalog", "filter": catalog_key_filter(MediaType.BOOK, "book-1")},
+    ),
+]
+
+async def seed():
+    memberships = [f"book-{j}" for j in range(5)]
+    shelves = [
+        ShelfModel(
+            id=ObjectId(SHELF_ID) if i == 0 else None,
+            user_id=f"{USER_ID}-{i}" if i else USER_ID,
+            name="Finished",
+            media_type=MediaType.BOOK,
+            shelf_type=ShelfType.DEFAULT,
+            status=ShelfStatus.FINISHED
+        )
+        for i in range(20)
+    ]
+    await ShelfModel.insert_many(shelves)
+    await ShelfItemModel.insert_many([
+        ShelfItemModel(
+            user_id=shelf.user_id,
+            shelf_id=str(shelf.id),
+            media_id=media_id,
+            media_type=MediaType.BOOK,
+            title=media_id
+        )
+        for shelf in shelves for media_id in memberships
+    ])
+    await MediaItem.insert_many([
+        MediaItem(media_type=MediaType.BOOK, media_id=f"book-{j}", title=f"Book {j}") for j in range(5)
+    ])
+
+def collection_scans(plan) -> Iterator[str]:
+    """Yield a description of every collection scan found in an explain document"""
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            yield "COLLSCAN"
+        if plan.get("collectionScans"):
+            yield f"$lookup collectionScans={plan['collectionScans']}"
+        for key, value in plan.items():
+            if key not in ("rejectedPlans", "allPlansExecution"):
+                yield from collection_scans(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from collection_scans(value)
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="shelfd_plan_check")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.uri)
+    database = client[args.database]
+    await client.drop_database(args.database)
+    await init_beanie(database=database, document_models=MODELS, skip_indexes=True)
+    try:
+        await index_builder.build(MODELS)
+        if index_builder.failed:
+            print(f"Index build failed: {index_builder.failed}")
+            return 1
+        await seed()
+
+        failures = 0
+        for description, command in QUERIES:
+            explain = await database.command({"explain": command, "verbosity": "executionStats"})
+            scans = sorted(set(collection_scans(explain)))
+            status = "FAIL " + ", ".join(scans) if scans else "ok"
+            print(f"{status:<40} {description}")
+            failures += bool(scans)
+        return 1 if failures else 0
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,59 @@
+"""Apply pending data migrations, resuming any that were interrupted.
+
+Each migration streams its collection in batches, writes with bulk_write
+and checkpoints after every batch, so it can be stopped and re-run at any
+point. Run from the backend directory:
+
+    python -m scripts.migrate --dry-run
+    python -m scripts.migrate --ops-per-second 2000
+    python -m scripts.migrate --only 0001_shelf_membership
+
+Uses the configured MongoDB cluster unless --uri is given.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from config import Settings
+from app.database.migrations import MIGRATIONS, MigrationRunner
+from app.database.models.migration import MigrationState
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", help="MongoDB URI (defaults to the configured cluster)")
+    parser.add_argument("--database", help="Database name (defaults to MONGODB_NAME)")
+    parser.add_argument("--only", action="append", help="Run just this migration (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--ops-per-second", type=float, help="Target write rate (default: unthrottled)")
+    parser.add_argument("--dry-run", action="store_true", help="Plan every batch but write nothing")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    settings = Settings()
+    client = AsyncIOMotorClient(args.uri or settings.mongodb_url)
+    database = client[args.database or settings.MONGODB_NAME]
+    await init_beanie(database=database, document_models=[MigrationState])
+    migrations = [m for m in MIGRATIONS if not args.only or m.name in args.only]
+    unknown = set(args.only or ()) - {m.name for m in migrations}
+    if unknown:
+        print(f"Unknown migrations: {', '.join(sorted(unknown))}")
+        return 1
+    try:
+        runner = MigrationRunner(
+            database,
+            batch_size=args.batch_size,
+            ops_per_second=args.ops_per_second,
+            dry_run=args.dry_run
+        )
+        for report in await runner.run(migrations):
+            print(f"{report['name']:<28} {report['status']:<8} {report['processed']:>8} documents {report['writes']:>8} writes")
+        return 0
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))